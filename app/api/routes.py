@@ -1,19 +1,34 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from sys import intern
+from typing import Annotated, List, Optional
+import hashlib
 import logging
-from pydantic import BaseModel
+import time
+from pydantic import BaseModel, Field, field_validator
 
 from .serializers import TravelSerializer
-from ..services.travel_api import TravelAPI # API definition for travel service. 
 from ..config.config import MIN_NIGHTS, MAX_NIGHTS, AIRPORT_CODE_LENGTH
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+def _record_search(request: Request, **record) -> None:
+    # Enqueue only; SearchStatsQueue applies records from its background task
+    stats_queue = getattr(request.app.state, "stats_queue", None)
+    if stats_queue is not None:
+        stats_queue.record(**record)
+
 class SearchRequest(BaseModel):
-    origin: str
-    nights: int
-    budget: float
+    origin: str = Field(..., min_length=AIRPORT_CODE_LENGTH, max_length=AIRPORT_CODE_LENGTH)
+    nights: int = Field(..., ge=MIN_NIGHTS, le=MAX_NIGHTS)
+    budget: float = Field(..., ge=0)
+
+    @field_validator('origin')
+    @classmethod
+    def _normalize_origin(cls, v: str) -> str:
+        return intern(v.upper())
 
 class MultiCitySearchRequest(BaseModel):
     origin: str
@@ -22,52 +37,92 @@ class MultiCitySearchRequest(BaseModel):
     total_nights: int
     budget: float
 
-@router.get("/search")
-async def search_trips(
-    origin: str = Query(..., min_length=AIRPORT_CODE_LENGTH, max_length=AIRPORT_CODE_LENGTH),
-    nights: int = Query(..., ge=MIN_NIGHTS, le=MAX_NIGHTS),
-    budget: float = Query(..., ge=0)
-):
+    @field_validator('origin')
+    @classmethod
+    def _normalize_origin(cls, v: str) -> str:
+        return intern(v.upper())
+
+    @field_validator('must_visit', 'optional_visit')
+    @classmethod
+    def _normalize_cities(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        # Normalized once here; interned codes hash/compare by identity in the engine
+        return [intern(city.upper()) for city in v] if v else v
+
+@router.get("/search", response_class=ORJSONResponse)
+async def search_trips(request: Request, params: Annotated[SearchRequest, Query()]):
     try:
-        logger.info(f"Searching trips for origin={origin}, nights={nights}, budget={budget}")
+        logger.info("Searching trips for origin=%s, nights=%s, budget=%s", params.origin, params.nights, params.budget)
         
-        if not hasattr(router, "travel_api"):
+        travel_api = getattr(request.app.state, "travel_api", None)
+        if travel_api is None:
             raise HTTPException(status_code=503, detail="Service not initialized")
 
-        return await router.travel_api.search_engine.search_trips(
-            origin=origin.upper(),
-            nights=nights,
-            budget=budget
+        started = time.perf_counter()
+        results = await travel_api.search_engine.search_trips(
+            origin=params.origin,
+            nights=params.nights,
+            budget=params.budget
+        )
+        _record_search(
+            request,
+            origin=params.origin,
+            destinations=list(dict.fromkeys(trip["destination"] for trip in results)),
+            budget=params.budget,
+            success=bool(results),
+            duration_ms=(time.perf_counter() - started) * 1000
         )
+        # Results are already plain dicts, so skip FastAPI's jsonable_encoder pass
+        response = ORJSONResponse(results)
 
+        # Conditional GET: repeat clients holding the same body get a bodiless 304
+        etag = f'"{hashlib.md5(response.body).hexdigest()}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return response
+
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error processing request: {str(e)}", exc_info=True)
+        logger.error("Error processing request: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/multi-city-search")
-async def search_multi_city_trips(request: MultiCitySearchRequest):
+@router.get("/multi-city-search", response_class=ORJSONResponse)
+async def search_multi_city_trips(request: MultiCitySearchRequest, http_request: Request):
     try:
-        logger.info(f"Multi-city search: {request}")
+        logger.info("Multi-city search: %s", request)
         
-        if not hasattr(router, "travel_api"):
+        travel_api = getattr(http_request.app.state, "travel_api", None)
+        if travel_api is None:
             raise HTTPException(status_code=503, detail="Service not initialized")
 
-        trips = router.travel_api.multi_city_engine.search_multi_city_trips(
-            origin=request.origin.upper(),
+        # CPU-bound tree search runs in the threadpool instead of blocking the event loop
+        started = time.perf_counter()
+        trips = await run_in_threadpool(
+            travel_api.multi_city_engine.search_multi_city_trips,
+            origin=request.origin,
             must_visit_cities=request.must_visit,
             optional_cities=request.optional_visit or [],
             total_nights=request.total_nights,
             budget=request.budget
         )
+        _record_search(
+            http_request,
+            origin=request.origin,
+            destinations=request.must_visit + (request.optional_visit or []),
+            budget=request.budget,
+            success=bool(trips),
+            duration_ms=(time.perf_counter() - started) * 1000
+        )
 
         if not trips:
             raise HTTPException(status_code=404, detail="No valid multi-city trips found")
 
-        return [TravelSerializer.format_multi_city_trip(trip) for trip in trips]
+        return ORJSONResponse([TravelSerializer.format_multi_city_trip(trip) for trip in trips])
 
     except HTTPException as he:
         raise he
     except Exception as e:
-        logger.error(f"Error processing request: {str(e)}", exc_info=True)
+        logger.error("Error processing request: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
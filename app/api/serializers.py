@@ -1,6 +1,9 @@
 from typing import Dict, Any, List
 from ..models.domain import TripPackage, Flight, Hotel
 
+# 'HH:MM' label for every minute of the day, indexed by minutes since midnight
+_HHMM = [f"{h:02d}:{m:02d}" for h in range(24) for m in range(60)]
+
 class TravelSerializer:
     @staticmethod
     def format_trip_package(trip: TripPackage) -> dict:
@@ -16,39 +19,58 @@ class TravelSerializer:
     
     @staticmethod
     def format_flight(flight: Flight) -> Dict[str, Any]:
-        return {
-            "id": flight.id,
-            "from": flight.origin,
-            "to": flight.destination,
-            "departure_time": flight.departure_time.strftime('%H:%M'),
-            "arrival_time": flight.arrival_time.strftime('%H:%M'),
-            "price": flight.price,
-            "stops": flight.stops
-        }
+        # Flights are immutable after ingest, so the dict is built once and shared
+        serialized = flight.serialized
+        if serialized is None:
+            serialized = {
+                "id": flight.id,
+                "from": flight.origin,
+                "to": flight.destination,
+                "departure_time": flight.departure_label or _HHMM[flight.departure_time],
+                "arrival_time": flight.arrival_label or _HHMM[flight.arrival_time],
+                "price": flight.price,
+                "stops": flight.stops
+            }
+            # Frozen dataclass: fill the cache slot without going through __setattr__
+            object.__setattr__(flight, 'serialized', serialized)
+        return serialized
     
     @staticmethod
     def format_hotel(hotel: Hotel) -> Dict[str, Any]:
-        return {
-            "id": hotel.id,
-            "name": hotel.name,
-            "stars": hotel.stars,
-            "rating": hotel.rating,
-            "price_per_night": hotel.price_per_night,
-            "amenities": hotel.amenities
-        }
+        serialized = hotel.serialized
+        if serialized is None:
+            serialized = {
+                "id": hotel.id,
+                "name": hotel.name,
+                "stars": hotel.stars,
+                "rating": hotel.rating,
+                "price_per_night": hotel.price_per_night,
+                "amenities": hotel.amenities
+            }
+            object.__setattr__(hotel, 'serialized', serialized)
+        return serialized
 
     @staticmethod
     def format_multi_city_trip(trip: List[Any]) -> Dict[str, Any]:
+        stays = []
+        cities_visited = []
+        total_cost = 0
+        total_nights = 0
+        # Single pass over the stays builds the entries and the totals together
+        for stay in trip:
+            stays.append({
+                "city": stay.city,
+                "flight": TravelSerializer.format_flight(stay.arrival_flight),
+                "hotel": TravelSerializer.format_hotel(stay.hotel) if stay.hotel else None,
+                "nights": stay.nights
+            })
+            total_cost += stay.cost
+            total_nights += stay.nights
+            cities_visited.append(stay.city)
+
         return {
-            "stays": [
-                {
-                    "city": stay.city,
-                    "flight": TravelSerializer.format_flight(stay.arrival_flight),
-                    "hotel": TravelSerializer.format_hotel(stay.hotel) if stay.hotel else None,
-                    "nights": stay.nights
-                } for stay in trip
-            ],
-            "total_cost": sum(stay.cost for stay in trip),
-            "total_nights": sum(stay.nights for stay in trip),
-            "cities_visited": [stay.city for stay in trip]
-        }
\ No newline at end of file
+            "stays": stays,
+            "total_cost": total_cost,
+            "total_nights": total_nights,
+            "cities_visited": cities_visited
+        }
@@ -12,7 +12,7 @@ Config categories:
 from pathlib import Path
 
 # Base Paths & Files
-BASE_DIR = Path(__file__).resolve().parent.parent
+BASE_DIR = Path(__file__).resolve().parent.parent.parent  # Project root
 DATA_DIR = BASE_DIR / "data"
 LOGS_DIR = BASE_DIR / "logs"
 
@@ -29,6 +29,12 @@ LOG_FILE_BACKUP_COUNT = 5
 # Cache Configuration
 REDIS_URL = "redis://localhost:6379/0"
 DEFAULT_CACHE_TTL = 3600  # 1 hour in seconds
+LOCAL_CACHE_TTL = 60  # In-process response cache, seconds
+LOCAL_CACHE_MAX_ENTRIES = 1024
+
+# Search Statistics
+STATS_QUEUE_MAXSIZE = 10000  # Records buffered before new ones are dropped
+STATS_BATCH_SIZE = 256  # Records applied per drain step
 
 # Search Parameters
 MAX_SEARCH_RESULTS = 50  # Maximum number of search results
@@ -36,6 +42,8 @@ MIN_NIGHTS = 1  # Minimum nights
 MAX_NIGHTS = 30  # Maximum nights
 AIRPORT_CODE_LENGTH = 3  # IATA format https://airportcodes.aero/
 MIN_CUSTOMER_SPENDING = 0
+ROUTE_CACHE_SIZE = 4096  # Route enumerations kept per search engine
+ROUTE_BUDGET_STEP = 50  # Budgets sharing a cached route enumeration
 
 # Hotel Configuration
 HOTEL_STAY = {
@@ -132,6 +140,11 @@ AIRCRAFT_SCORES = {
    }
 }
 
+# Tier lists flattened to name -> score; reversed so a name listed in several
+# tiers keeps its first tier's score, as the tier-by-tier scan did
+AIRLINE_SCORE_MAP = {airline: tier['score'] for tier in reversed(AIRLINE_SCORES.values()) for airline in tier['airlines']}
+AIRCRAFT_SCORE_MAP = {aircraft: category['score'] for category in reversed(AIRCRAFT_SCORES.values()) for aircraft in category['types']}
+
 # Airport categories
 AIRPORT_SCORES = {
    'MAJOR_HUB': {'score': 100, 'min_routes': 100},
@@ -1,11 +1,26 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from .services.stats import SearchStats
+from .services.stats import SearchStats, SearchStatsQueue
+from .services.travel_api import TravelAPI
 from fastapi.middleware.cors import CORSMiddleware
-import json
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import orjson
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from .api.routes import router, TravelAPI
+from typing import Any
+from .api.routes import router
+from .config.config import (
+    FLIGHTS_FILE,
+    HOTELS_FILE,
+    LOG_FILE,
+    LOG_FILE_BACKUP_COUNT,
+    LOG_FILE_MAX_BYTES,
+    LOG_FORMAT,
+    LOGS_DIR
+)
 
 
 def setup_logging():
@@ -15,101 +30,120 @@ def setup_logging():
     Creates a logs directory and sets up both file and console logging handlers.
     File logging uses rotation to manage disk space.
     
+    Log calls only enqueue the formatted record; a QueueListener thread owns the
+    console and file handlers, so disk writes and rotation never block a request.
+    
     File Handler: Detailed DEBUG level logs with rotation
     Console Handler: Basic INFO level logs
     """
     # Create logs directory if it doesn't exist
-    logs_dir = Path(__file__).resolve().parent.parent / "logs"
-    logs_dir.mkdir(exist_ok=True)
+    LOGS_DIR.mkdir(exist_ok=True)
+
+    # Records reach these already formatted by the QueueHandler
+    listener = QueueListener(
+        queue.SimpleQueue(),
+        # Console handler with INFO level
+        logging.StreamHandler(),
+        # File handler with DEBUG level for more details
+        RotatingFileHandler(
+            LOG_FILE,
+            maxBytes=LOG_FILE_MAX_BYTES,
+            backupCount=LOG_FILE_BACKUP_COUNT,
+            encoding='utf-8'),
+        respect_handler_level=True)
 
     # Configure logging
     logging.basicConfig(
         level=logging.DEBUG,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            # Console handler with INFO level
-            logging.StreamHandler(),
-            # File handler with DEBUG level for more details
-            RotatingFileHandler(
-                logs_dir / "travel_search.log",
-                maxBytes=10485760,  # 10MB
-                backupCount=5,
-                encoding='utf-8')
-        ])
+        format=LOG_FORMAT,
+        handlers=[QueueHandler(listener.queue)])
+
+    listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(listener.stop)
 
 
 # Initialize logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
-# Initialize FastAPI app
-app = FastAPI(
-    title="Travel Search API",
-    description="API for searching and booking multi-city travel packages",
-    version="1.0.0")
+def load_json(path: Path) -> Any:
+    """Read and parse one JSON data file."""
+    logger.debug("Loading %s", path)
+    return orjson.loads(path.read_bytes())
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include API routes
-app.include_router(router)
-
-
-@app.on_event("startup")
-async def startup_event():
+async def initialize_services(app: FastAPI) -> None:
     """
-    Initialize application services on startup.
+    Initialize application services once, before the app starts serving.
     
     Performs the following tasks:
-    1. Loads flight and hotel data from JSON files
-    2. Initializes the statistics collector
+    1. Loads flight and hotel data from JSON files (both in parallel, in worker threads)
+    2. Initializes the statistics collector and its write queue
     3. Sets up the Travel API service
     
+    Services are stored on ``app.state`` for the request handlers.
+    
     Raises:
         FileNotFoundError: If data files are missing
         JSONDecodeError: If data files contain invalid JSON
     """
     try:
-        # Get the base directory path
-        base_dir = Path(__file__).resolve().parent.parent
-
-        # Load data files using absolute paths
-        logger.debug(
-            f"Loading flights from {base_dir / 'data' / 'flights.json'}")
-        with open(base_dir / "data" / "flights.json") as f:
-            flights = json.load(f)
-        logger.info(f"Loaded {len(flights)} flights")
-
-        logger.debug(
-            f"Loading hotels from {base_dir / 'data' / 'hotels.json'}")
-        with open(base_dir / "data" / "hotels.json") as f:
-            hotels = json.load(f)
-        logger.info(f"Loaded {len(hotels)} hotels")
+        # Load data files using the absolute paths from config; the reads and
+        # parses of the two files overlap instead of running back to back
+        flights, hotels = await asyncio.gather(
+            asyncio.to_thread(load_json, FLIGHTS_FILE),
+            asyncio.to_thread(load_json, HOTELS_FILE)
+        )
+        logger.info("Loaded %d flights", len(flights))
+        logger.info("Loaded %d hotels", len(hotels))
 
         # Initialize services
-        router.stats = SearchStats()
+        app.state.stats = SearchStats()
+        app.state.stats_queue = SearchStatsQueue(app.state.stats)
         logger.info("Successfully initialized Stats Collector")
 
-        router.travel_api = TravelAPI(flights, hotels)
+        app.state.travel_api = TravelAPI(flights, hotels)
         logger.info("Successfully initialized Travel API")
 
     except FileNotFoundError as e:
-        logger.error(f"Error: Could not find data files - {str(e)}")
+        logger.error("Error: Could not find data files - %s", e)
         raise
-    except json.JSONDecodeError as e:
-        logger.error(f"Error: Invalid JSON in data files - {str(e)}")
+    except orjson.JSONDecodeError as e:
+        logger.error("Error: Invalid JSON in data files - %s", e)
         raise
     except Exception as e:
-        logger.error(f"Error during startup: {str(e)}", exc_info=True)
+        logger.error("Error during startup: %s", e, exc_info=True)
         raise
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await initialize_services(app)
+    app.state.stats_queue.start()
+    yield
+    await app.state.stats_queue.stop()
+
+
+# Initialize FastAPI app
+app = FastAPI(
+    title="Travel Search API",
+    description="API for searching and booking multi-city travel packages",
+    version="1.0.0",
+    lifespan=lifespan)
+
+# Add CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # Configure appropriately for production
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Include API routes
+app.include_router(router)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,52 +1,89 @@
-from pydantic import BaseModel, Field
-from datetime import datetime, timedelta
-from typing import List, Optional
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
 from enum import Enum
-from ..config.config import MIN_NIGHTS, MAX_NIGHTS,SCORING_WEIGHTS, AIRPORT_CODE_LENGTH, MIN_CUSTOMER_SPENDING, HOTEL_STAY
+from ..config.config import MIN_NIGHTS, MAX_NIGHTS, AIRPORT_CODE_LENGTH, MIN_CUSTOMER_SPENDING
 class TravelClass(Enum):
     ECONOMY = "economy"
     BUSINESS = "business"
     FIRST = "first"
 
-class Airport(BaseModel):
-    code: str = Field(..., min_length=AIRPORT_CODE_LENGTH, max_length=AIRPORT_CODE_LENGTH)
+@dataclass(slots=True, frozen=True)
+class Airport:
+    code: str
     city: str
     timezone: str
 
-class Flight(BaseModel):
+    def __post_init__(self):
+        if len(self.code) != AIRPORT_CODE_LENGTH:
+            raise ValueError(f"Airport code must be {AIRPORT_CODE_LENGTH} characters: {self.code!r}")
+
+@dataclass(slots=True, frozen=True)
+class Flight:
     id: str
-    origin: str = Field(..., min_length=AIRPORT_CODE_LENGTH, max_length=AIRPORT_CODE_LENGTH)
-    destination: str = Field(..., min_length=AIRPORT_CODE_LENGTH, max_length=AIRPORT_CODE_LENGTH)
-    departure_time: datetime
-    arrival_time: datetime
-    price: float = Field(..., gt=MIN_CUSTOMER_SPENDING)
-    stops: List[str] = []
+    origin: str
+    destination: str
+    departure_time: int  # Minutes since midnight
+    arrival_time: int  # Minutes since midnight
+    price: float
+    stops: Tuple[str, ...] = ()
+    # Optional carrier details; scoring skips flights where these are unknown
+    airline: Optional[str] = None
+    aircraft_type: Optional[str] = None
+    # Raw 'HH:MM' labels kept from ingest so serialization never re-formats
+    departure_label: Optional[str] = field(default=None, repr=False, compare=False)
+    arrival_label: Optional[str] = field(default=None, repr=False, compare=False)
+    # Derived at construction; scoring reads these instead of recomputing them
+    departure_hour: int = field(init=False, repr=False, compare=False)
+    stop_count: int = field(init=False, repr=False, compare=False)
+    duration_minutes: int = field(init=False, repr=False, compare=False)
+    is_direct: bool = field(init=False, repr=False, compare=False)
+    # Response dict built once by TravelSerializer and reused afterwards
+    serialized: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
 
-    @property
-    def duration(self) -> timedelta:
-        return self.arrival_time - self.departure_time
+    def __post_init__(self):
+        if len(self.origin) != AIRPORT_CODE_LENGTH or len(self.destination) != AIRPORT_CODE_LENGTH:
+            raise ValueError(f"Flight {self.id}: airport codes must be {AIRPORT_CODE_LENGTH} characters")
+        if not self.price > MIN_CUSTOMER_SPENDING:
+            raise ValueError(f"Flight {self.id}: price must be greater than {MIN_CUSTOMER_SPENDING}")
+        object.__setattr__(self, 'departure_hour', self.departure_time // 60)
+        object.__setattr__(self, 'stop_count', len(self.stops))
+        object.__setattr__(self, 'duration_minutes', self.arrival_time - self.departure_time)
+        object.__setattr__(self, 'is_direct', not self.stops)
 
     @property
-    def is_direct(self) -> bool:
-        return len(self.stops) == 0
+    def duration(self) -> timedelta:
+        return timedelta(minutes=self.duration_minutes)
 
-class Hotel(BaseModel):
+@dataclass(slots=True, frozen=True)
+class Hotel:
     id: str
     name: str
-    city_code: str = Field(..., min_length=MIN_NIGHTS, max_length=MAX_NIGHTS)
-    stars: int = Field(..., ge=1, le=5)
-    rating: float = Field(..., ge=0, le=5)
-    price_per_night: float = Field(..., gt=0)
-    amenities: List[str]
+    city_code: str
+    stars: int
+    rating: float
+    price_per_night: float
+    amenities: Tuple[str, ...]
+    # Amenity points total, filled in by TripScorer the first time the hotel is scored
+    amenity_points: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    serialized: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
 
-class TripPackage(BaseModel):
-    score: Optional[float] = None
-    destination: str = Field(..., min_length=MIN_NIGHTS, max_length=MAX_NIGHTS)
-    outbound_path: List[Flight] = Field(default_factory=list)
-    return_path: List[Flight] = Field(default_factory=list)
-    total_cost: float = 0
+    def __post_init__(self):
+        if not MIN_NIGHTS <= len(self.city_code) <= MAX_NIGHTS:
+            raise ValueError(f"Hotel {self.id}: invalid city code {self.city_code!r}")
+        if not (1 <= self.stars <= 5 and 0 <= self.rating <= 5 and self.price_per_night > 0):
+            raise ValueError(f"Hotel {self.id}: stars, rating or price out of range")
+
+@dataclass(slots=True, frozen=True)
+class TripPackage:
+    # Built only by the search engine from validated inputs, so no per-package validation
+    destination: str
     hotel: Hotel
-    nights: int = Field(..., ge=HOTEL_STAY['MIN_NIGHTS'], le=HOTEL_STAY['MAX_NIGHTS'])
+    nights: int
+    outbound_path: List[Flight] = field(default_factory=list)
+    return_path: List[Flight] = field(default_factory=list)
+    total_cost: float = 0
+    score: Optional[float] = None
 
     @property
     def outbound_flight(self) -> Flight:
@@ -55,16 +92,3 @@ class TripPackage(BaseModel):
     @property
     def return_flight(self) -> Flight:
         return self.return_path[0] if self.return_path else None
-
-    @property
-    def total_cost(self) -> float:
-        return (sum(f.price for f in self.outbound_path) + 
-                sum(f.price for f in self.return_path) + 
-                self.hotel.price_per_night * self.nights)
-
-    def _calculate_convenience_score(self) -> float:
-        total_stops = sum(len(f.stops) for f in self.outbound_path + self.return_path)
-        score = 10.0 - total_stops * 2
-        if 8 <= self.outbound_flight.departure_time.hour <= 20:
-            score += 2
-        return max(score, 0)
\ No newline at end of file
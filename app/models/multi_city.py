@@ -1,32 +1,51 @@
 # models/multi_city.py
-from dataclasses import dataclass
-from typing import Dict, List, Optional
-from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
 import heapq
+import math
+from itertools import count
 
 from app.models.domain import Hotel
 
-@dataclass
+# Leg score weights, bound once instead of rebuilt on every leg
+_LEG_PRICE_WEIGHT = 0.4
+_LEG_FLIGHT_WEIGHT = 0.3
+_LEG_HOTEL_WEIGHT = 0.3
+
+@dataclass(slots=True)
 class MultiCityFlight:
     id: str
     origin: str
     destination: str
-    departure_time: datetime
-    arrival_time: datetime
+    departure_time: int  # Minutes since midnight
+    arrival_time: int  # Minutes since midnight
     price: float
-    stops: List[str]
+    stops: Tuple[str, ...]
+    departure_label: Optional[str] = field(default=None, repr=False)
+    arrival_label: Optional[str] = field(default=None, repr=False)
+    serialized: Optional[Dict[str, Any]] = field(default=None, repr=False)
+    departure_hour: int = field(init=False, repr=False)
+    stop_count: int = field(init=False, repr=False)
+    # Flight convenience part of the leg score; depends only on the flight
+    convenience_score: float = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.departure_hour = self.departure_time // 60
+        self.stop_count = len(self.stops)
+        self.convenience_score = 10.0 - self.stop_count * 2 + 2 * (8 <= self.departure_hour <= 20)
 
-@dataclass
+@dataclass(slots=True)
 class MultiCityStay:
     city: str
     arrival_flight: MultiCityFlight
     hotel: Optional['Hotel']  # Optional for last city if no stay needed
     nights: int
-    
-    @property
-    def cost(self) -> float:
+    cost: float = field(init=False)
+
+    def __post_init__(self):
+        # Stays are never modified, so the cost is computed once up front
         hotel_cost = self.hotel.price_per_night * self.nights if self.hotel else 0
-        return self.arrival_flight.price + hotel_cost
+        self.cost = self.arrival_flight.price + hotel_cost
 
 class MultiCityTripNode:
     def __init__(self, 
@@ -74,10 +93,8 @@ class MultiCityTripNode:
         # Price score (lower price = higher score)
         price_score = 1000 / stay.cost if stay.cost > 0 else 0
         
-        # Flight convenience score
-        flight_score = 10.0 - len(stay.arrival_flight.stops) * 2
-        if 8 <= stay.arrival_flight.departure_time.hour <= 20:
-            flight_score += 2
+        # Flight convenience score, precomputed per flight
+        flight_score = stay.arrival_flight.convenience_score
         
         # Hotel score (if applicable)
         hotel_score = 0
@@ -85,10 +102,18 @@ class MultiCityTripNode:
             hotel_score = stay.hotel.rating * stay.hotel.stars + len(stay.hotel.amenities) * 0.5
         
         # Weighted combination
-        weights = {'price': 0.4, 'flight': 0.3, 'hotel': 0.3}
-        return (price_score * weights['price'] + 
-                flight_score * weights['flight'] + 
-                hotel_score * weights['hotel'])
+        return (price_score * _LEG_PRICE_WEIGHT + 
+                flight_score * _LEG_FLIGHT_WEIGHT + 
+                hotel_score * _LEG_HOTEL_WEIGHT)
+
+def _unlink_path(path: Optional[Tuple[MultiCityStay, Any]]) -> List[MultiCityStay]:
+    """Turn a (stay, previous link) linked list into the list of stays in visit order"""
+    stays = []
+    while path is not None:
+        stay, path = path
+        stays.append(stay)
+    stays.reverse()
+    return stays
 
 class MultiCitySearchEngine:
     def __init__(self, flights: List[MultiCityFlight], hotels: Dict[str, List[Hotel]]):
@@ -103,6 +128,23 @@ class MultiCitySearchEngine:
             if flight.origin not in self.flights_by_origin:
                 self.flights_by_origin[flight.origin] = []
             self.flights_by_origin[flight.origin].append(flight)
+
+        # Cheapest hotel night per city, and the cheapest possible one-night stay
+        # (cheapest arrival + cheapest hotel) as a lower bound on visiting the city
+        self.min_hotel_price = {
+            city: min(hotel.price_per_night for hotel in city_hotels)
+            for city, city_hotels in self.hotels.items()
+            if city_hotels
+        }
+        min_arrival_price = {}
+        for flight in self.flights:
+            if flight.price < min_arrival_price.get(flight.destination, math.inf):
+                min_arrival_price[flight.destination] = flight.price
+        self.min_stay_cost = {
+            city: min_arrival_price[city] + min_hotel_price
+            for city, min_hotel_price in self.min_hotel_price.items()
+            if city in min_arrival_price
+        }
     
     def search_multi_city_trips(self, 
                               origin: str, 
@@ -116,36 +158,68 @@ class MultiCitySearchEngine:
         Returns top N trips sorted by cumulative score
         """
         root = MultiCityTripNode(origin, budget)
-        top_trips = []  # Will store (score, trip) tuples
+        top_trips = []  # Will store (score, tie-breaker, trip) tuples
+        tie_breaker = count()
+        
+        # Cities to visit as bits of an int, so set checks are single bitwise ops.
+        # city_counts keeps how often each city was listed, since the stay-length
+        # bound counts the remaining list entries, duplicates included.
+        all_cities = must_visit_cities + optional_cities
+        city_bits = {city: 1 << i for i, city in enumerate(dict.fromkeys(all_cities))}
+        city_counts = {city: all_cities.count(city) for city in city_bits}
+        must_visit_mask = 0
+        for city in must_visit_cities:
+            must_visit_mask |= city_bits[city]
+        
+        required_stay_costs = [(city_bits[city], self.min_stay_cost.get(city, math.inf))
+                               for city in dict.fromkeys(must_visit_cities)]
+        
+        def required_cost_bound(mask: int) -> float:
+            """Least budget that visiting the required cities left in mask can take"""
+            return sum(cost for bit, cost in required_stay_costs if bit & mask)
         
         def build_trip_tree(node: MultiCityTripNode, 
-                          remaining_cities: List[str],
+                          remaining_mask: int,
+                          remaining_count: int,
                           remaining_nights: int,
-                          path: List[MultiCityStay] = None):
-            if path is None:
-                path = []
+                          path: Optional[Tuple[MultiCityStay, Any]] = None):
+            # path is a linked list of (stay, previous link) pairs, last stay first:
+            # extending it is O(1), and only the final top trips become lists
             
             # Base case: check if we've visited all required cities
-            if not any(city in must_visit_cities for city in remaining_cities):
+            if not remaining_mask & must_visit_mask:
                 # Valid trip found - add to results
-                trip_score = node.cumulative_score
+                # The descending counter breaks score ties without comparing stays, and
+                # makes a newcomer that only ties the current minimum lose to it
+                entry = (node.cumulative_score, -next(tie_breaker), path)
                 if len(top_trips) < max_results:
-                    heapq.heappush(top_trips, (trip_score, path.copy()))
-                elif trip_score > top_trips[0][0]:
-                    heapq.heapreplace(top_trips, (trip_score, path.copy()))
+                    heapq.heappush(top_trips, entry)
+                else:
+                    heapq.heappushpop(top_trips, entry)
                 return
             
             # Get available flights from current city
             available_flights = self.flights_by_origin.get(node.city, [])
             
             for flight in available_flights:
-                if flight.destination not in remaining_cities:
+                # A node keeps one child per city; once claimed, no other stay there can be added
+                if not city_bits.get(flight.destination, 0) & remaining_mask or flight.destination in node.children:
+                    continue
+                
+                # Get available hotels
+                city_hotels = self.hotels.get(flight.destination, [])
+                cheapest_night = self.min_hotel_price.get(flight.destination)
+                if cheapest_night is None:
                     continue
                 
                 # Try different lengths of stay
-                for nights in range(1, min(remaining_nights - len(remaining_cities) + 2, 5)):
-                    # Get available hotels
-                    city_hotels = self.hotels.get(flight.destination, [])
+                for nights in range(1, min(remaining_nights - remaining_count + 2, 5)):
+                    if flight.destination in node.children:
+                        break
+                    # Stay cost grows with nights: once even the cheapest hotel leaves no
+                    # budget, neither this nor any longer stay on this flight can fit
+                    if flight.price + cheapest_night * nights >= node.remaining_budget:
+                        break
                     for hotel in city_hotels:
                         # Create a stay
                         stay = MultiCityStay(flight.destination, flight, hotel, nights)
@@ -153,19 +227,23 @@ class MultiCitySearchEngine:
                             # Try adding this stay
                             next_node = node.add_next_city(flight.destination, stay)
                             if next_node:
-                                new_remaining = [c for c in remaining_cities 
-                                              if c != flight.destination]
-                                new_path = path + [stay]
+                                new_mask = remaining_mask & ~city_bits[flight.destination]
+                                # The city stays claimed either way, but a subtree that cannot
+                                # afford the remaining required cities holds no trips
+                                if required_cost_bound(new_mask) > next_node.remaining_budget:
+                                    break
+                                new_path = (stay, path)
                                 
                                 # Recurse
                                 build_trip_tree(next_node, 
-                                             new_remaining,
+                                             new_mask,
+                                             remaining_count - city_counts[flight.destination],
                                              remaining_nights - nights,
                                              new_path)
+                                break
         
         # Start the search
-        all_cities = must_visit_cities + optional_cities
-        build_trip_tree(root, all_cities, total_nights)
+        build_trip_tree(root, (1 << len(city_bits)) - 1, len(all_cities), total_nights)
         
         # Return sorted results
-        return [trip for _, trip in sorted(top_trips, key=lambda x: x[0], reverse=True)]
\ No newline at end of file
+        return [_unlink_path(path) for _, _, path in sorted(top_trips, key=lambda x: x[0], reverse=True)]
\ No newline at end of file
@@ -1,24 +1,53 @@
+import asyncio
 import os
+from collections import OrderedDict
+from fnmatch import fnmatchcase
 from functools import wraps
-import json
-from typing import Optional, Callable
-import redis
+import time
+from typing import Any, Dict, Optional, Callable
+import orjson
+import redis.asyncio
 import logging
-import hashlib
 from fastapi import HTTPException
 from ..api.serializers import TravelSerializer
 from .search.criteria import SearchCriteria
+from ..config.config import DEFAULT_CACHE_TTL, LOCAL_CACHE_MAX_ENTRIES, LOCAL_CACHE_TTL, REDIS_URL
 
 logger = logging.getLogger(__name__)
 
 class TravelCache:
-    def __init__(self, redis_url: str = "redis://localhost:6379/0", default_ttl: int = 3600):
+    def __init__(self, redis_url: str = REDIS_URL, default_ttl: int = DEFAULT_CACHE_TTL):
         try:
-            self.redis_client = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+            self.redis_client = redis.asyncio.from_url(os.getenv('REDIS_URL', redis_url))
             self.default_ttl = default_ttl
         except redis.RedisError as e:
-            logger.warning(f"Failed to initialize Redis connection: {str(e)}. Caching will be disabled.")
+            logger.warning("Failed to initialize Redis connection: %s. Caching will be disabled.", e)
             self.redis_client = None
+        # In-process LRU tier in front of Redis: key -> (expires_at, serialized result)
+        self.local_cache: OrderedDict = OrderedDict()
+        # Lookups answered without running the search vs. lookups that ran it
+        self.hits = 0
+        self.misses = 0
+        # Cache key -> future of the lookup currently running for it
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _local_get(self, key: str) -> Optional[Any]:
+        entry = self.local_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self.local_cache[key]
+            return None
+        self.local_cache.move_to_end(key)
+        return value
+
+    def _local_set(self, key: str, value: Any, ttl: int) -> None:
+        self.local_cache[key] = (time.monotonic() + min(ttl, LOCAL_CACHE_TTL), value)
+        self.local_cache.move_to_end(key)
+        if len(self.local_cache) > LOCAL_CACHE_MAX_ENTRIES:
+            self.local_cache.popitem(last=False)
+
     def _generate_cache_key(self, prefix: str, *args, **kwargs) -> str:
         key_parts = [prefix]
         
@@ -30,57 +59,90 @@ class TravelCache:
                 f"budget={criteria.budget}"
             ])
         
-        key_string = ":".join(key_parts)
-        return hashlib.md5(key_string.encode()).hexdigest()
+        # Short and built from normalized fields, so the key is used as-is: no
+        # hashing per lookup, and prefix patterns like 'search_trips:*' match it
+        return ":".join(key_parts)
 
     def cache_decorator(self, ttl: Optional[int] = None, prefix: Optional[str] = None):
         def decorator(func: Callable):
             @wraps(func)
             async def wrapper(*args, **kwargs):
-                if not self.redis_client:
-                    result = await func(*args, **kwargs)
-                    return [TravelSerializer.format_trip_package(trip) for trip in result]
-
                 cache_prefix = prefix or func.__name__
                 cache_key = self._generate_cache_key(cache_prefix, *args, **kwargs)
-                
-                try:
-                    cached_result = self.redis_client.get(cache_key)
-                    if cached_result:
-                        logger.debug(f"Cache hit for key: {cache_key}")
-                        return json.loads(cached_result)
-                except redis.RedisError as e:
-                    logger.error(f"Redis error while getting cached value: {str(e)}")
-                    result = await func(*args, **kwargs)
-                    return [TravelSerializer.format_trip_package(trip) for trip in result]
-                
-                logger.debug(f"Cache miss for key: {cache_key}")
-                result = await func(*args, **kwargs)
-                serialized_result = [TravelSerializer.format_trip_package(trip) for trip in result]
-                
-                try:
-                    cache_ttl = ttl or self.default_ttl
-                    self.redis_client.setex(
-                        cache_key,
-                        cache_ttl,
-                        json.dumps(serialized_result)
-                    )
-                except (redis.RedisError, TypeError) as e:
-                    logger.error(f"Failed to cache result: {str(e)}")
-                
-                return serialized_result
+                cache_ttl = ttl or self.default_ttl
+
+                local_result = self._local_get(cache_key)
+                if local_result is not None:
+                    logger.debug("Local cache hit for key: %s", cache_key)
+                    self.hits += 1
+                    return local_result
+
+                # Single flight: concurrent misses for one key share a single lookup/search.
+                # It runs as its own task that every request, the first included, awaits
+                # through a shield, so a cancelled request cancels neither the shared work
+                # nor the other requests waiting on it.
+                pending = self._inflight.get(cache_key)
+                if pending is None:
+                    pending = asyncio.ensure_future(self._fetch(func, args, kwargs, cache_key, cache_ttl))
+                    self._inflight[cache_key] = pending
+                    pending.add_done_callback(lambda task: self._lookup_done(cache_key, task))
+                else:
+                    self.hits += 1
+                return await asyncio.shield(pending)
             return wrapper
         return decorator
 
-    def invalidate_pattern(self, pattern: str) -> int:
+    def _lookup_done(self, cache_key: str, task: asyncio.Future) -> None:
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved; every waiter may have gone away
+
+    async def _fetch(self, func: Callable, args: tuple, kwargs: dict, cache_key: str, cache_ttl: int) -> Any:
+        """Look the key up in Redis, or run func and store its serialized result"""
+        store = False
+        if self.redis_client:
+            try:
+                cached_result = await self.redis_client.get(cache_key)
+                if cached_result:
+                    logger.debug("Cache hit for key: %s", cache_key)
+                    self.hits += 1
+                    result = orjson.loads(cached_result)
+                    self._local_set(cache_key, result, cache_ttl)
+                    return result
+                logger.debug("Cache miss for key: %s", cache_key)
+                store = True
+            except redis.RedisError as e:
+                logger.error("Redis error while getting cached value: %s", e)
+
+        self.misses += 1
+        result = await func(*args, **kwargs)
+        serialized_result = [TravelSerializer.format_trip_package(trip) for trip in result]
+        self._local_set(cache_key, serialized_result, cache_ttl)
+
+        if store:
+            try:
+                await self.redis_client.setex(
+                    cache_key,
+                    cache_ttl,
+                    orjson.dumps(serialized_result)
+                )
+            except (redis.RedisError, orjson.JSONEncodeError) as e:
+                logger.error("Failed to cache result: %s", e)
+
+        return serialized_result
+
+    async def invalidate_pattern(self, pattern: str) -> int:
+        for key in [key for key in self.local_cache if fnmatchcase(key, pattern)]:
+            del self.local_cache[key]
         if not self.redis_client:
             return 0
             
         try:
-            keys = self.redis_client.keys(pattern)
+            keys = await self.redis_client.keys(pattern)
             if keys:
-                return self.redis_client.delete(*keys)
+                return await self.redis_client.delete(*keys)
             return 0
         except redis.RedisError as e:
-            logger.error(f"Failed to invalidate cache pattern {pattern}: {str(e)}")
+            logger.error("Failed to invalidate cache pattern %s: %s", pattern, e)
             raise HTTPException(status_code=500, detail="Cache invalidation failed")
\ No newline at end of file
@@ -1,7 +1,9 @@
+from itertools import chain
 from typing import Dict, List
+import numpy as np
 from app.config.config import (
-    AIRCRAFT_SCORES, 
-    AIRLINE_SCORES, 
+    AIRCRAFT_SCORE_MAP, 
+    AIRLINE_SCORE_MAP, 
     FLIGHT_TIME_SCORES,
     FLIGHT_QUALITY_WEIGHTS,
     HOTEL_WEIGHTS, 
@@ -10,9 +12,37 @@ from app.config.config import (
     SCORING_WEIGHTS,
     HOTEL_AMENITY_SCORES
 )
-from ...models.domain import Flight, TripPackage
+from ...models.domain import Flight, Hotel
 from dataclasses import dataclass
 
+# Bound once at import so the per-path and per-hotel scoring never touch the config dicts
+_W_TIME = FLIGHT_QUALITY_WEIGHTS['TIME']
+_W_STOPS = FLIGHT_QUALITY_WEIGHTS['STOPS']
+_W_AIRLINE = FLIGHT_QUALITY_WEIGHTS['AIRLINE']
+_W_AIRCRAFT = FLIGHT_QUALITY_WEIGHTS['AIRCRAFT']
+_HOTEL_STARS_MULT = HOTEL_WEIGHTS['STARS_MULTIPLIER']
+_HOTEL_RATING_MULT = HOTEL_WEIGHTS['RATING_MULTIPLIER']
+_HOTEL_AMENITY_MULT = HOTEL_WEIGHTS['AMENITY_MULTIPLIER']
+
+def _hour_score(hour: int) -> float:
+    for start, end, value in FLIGHT_TIME_SCORES.values():
+        if start <= hour <= end:
+            return value or FLIGHT_TIME_SCORES['OFF_HOURS'][2]
+    return FLIGHT_TIME_SCORES['OFF_HOURS'][2]
+
+# Departure time score for every hour of the day, indexed by Flight.departure_hour
+_HOUR_SCORES = tuple(_hour_score(hour) for hour in range(24))
+
+def _amenity_points_table() -> Dict[str, int]:
+    table = {}
+    for category in HOTEL_AMENITY_SCORES.values():
+        for amenity, points in category.items():
+            table[amenity] = table.get(amenity, 0) + points
+    return table
+
+# HOTEL_AMENITY_SCORES flattened to amenity -> points (summed if listed in several categories)
+_AMENITY_POINTS = _amenity_points_table()
+
 @dataclass
 class ScoreWeights:
     price: float = SCORING_WEIGHTS['PRICE']
@@ -24,120 +54,113 @@ class TripScorer:
     def __init__(self, weights: ScoreWeights = ScoreWeights()):
         self.weights = weights
 
-    def calculate_score(self, trip: TripPackage, context: Dict) -> float:
-        scores = {
-            'price': self._calculate_price_score(trip, context),
-            'flight': self._calculate_flight_score(trip),
-            'hotel': self._calculate_hotel_score(trip)
-        }
-        
-        weighted_score = sum(
-            score * getattr(self.weights, category)
-            for category, score in scores.items()
+    def score_packages(self,
+                       total_costs: np.ndarray,
+                       outbound_scores: np.ndarray,
+                       return_scores: np.ndarray,
+                       hotel_scores: np.ndarray,
+                       flight_counts: np.ndarray,
+                       context: Dict) -> np.ndarray:
+        """
+        Final 0-10 scores of packages given as parallel per-package arrays.
+
+        Flight path and hotel scores depend only on the path or hotel, so callers
+        compute them once with score_flight_paths / score_hotels and broadcast them
+        to the packages; this function then does the per-package arithmetic in bulk.
+        """
+        # Accumulate in place into a couple of buffers instead of allocating a
+        # temporary per operation
+        scores = self._price_scores(total_costs, context)
+        scores *= self.weights.price
+
+        buffer = outbound_scores * 0.6
+        buffer += return_scores * 0.4
+        buffer *= self.weights.flight
+        scores += buffer
+        np.multiply(hotel_scores, self.weights.hotel, out=buffer)
+        scores += buffer
+
+        # Complexity factor: max(0.7, 1 - (flights - 2) * 0.1)
+        np.multiply(flight_counts - 2, 0.1, out=buffer)
+        np.subtract(1, buffer, out=buffer)
+        np.maximum(buffer, 0.7, out=buffer)
+        scores *= buffer
+
+        scores /= 10
+        final_scores = np.clip(scores, 0, 10, out=scores)
+        # Python's round() rather than np.round, which scales first and can round differently at .xx5
+        return np.array([round(score, 2) for score in final_scores.tolist()])
+
+    def _price_scores(self, total_costs: np.ndarray, context: Dict) -> np.ndarray:
+        cost_ratios = total_costs / context.get('budget', 8000)
+        # Piecewise price curve over budget utilization; the first matching condition wins
+        return np.select(
+            [cost_ratios <= 0.3, cost_ratios <= 0.5, cost_ratios <= 0.7],
+            [100, 90 - (cost_ratios - 0.3) * 100, 70 - (cost_ratios - 0.5) * 100],
+            np.maximum(30, 50 - (cost_ratios - 0.7) * 150)
         )
-        
-        total_flights = len(trip.outbound_path) + len(trip.return_path)
-        complexity_factor = max(0.7, 1 - (total_flights - 2) * 0.1)
-        
-        final_score = weighted_score * complexity_factor
-        return round(max(0, min(10, final_score / 10)), 2)
-
-    def _calculate_price_score(self, trip: TripPackage, context: Dict) -> float:
-        total_cost = trip.total_cost
-        max_cost = context.get('budget', 8000)
-        
-        # Progressive scoring based on budget utilization
-        cost_ratio = total_cost / max_cost
-        if cost_ratio <= 0.3:
-            return 100
-        elif cost_ratio <= 0.5:
-            return 90 - (cost_ratio - 0.3) * 100
-        elif cost_ratio <= 0.7:
-            return 70 - (cost_ratio - 0.5) * 100
-        else:
-            return max(30, 50 - (cost_ratio - 0.7) * 150)
-
-    def _calculate_flight_score(self, trip: TripPackage) -> float:
-        def score_flight_path(flights: List[Flight]) -> float:
-            if not flights:
-                return 0
-                
-            total_stops = sum(len(f.stops) for f in flights)
-            num_segments = len(flights)
-            
-            # Calculate components with weights from FLIGHT_QUALITY_WEIGHTS
-            time_score = self._calculate_time_score(flights)
-            stops_score = 100 - (total_stops * STOP_PENALTY)
-            airline_score = self._calculate_airline_score(flights)
-            aircraft_score = self._calculate_aircraft_score(flights)
-            
-            # Apply quality weights
-            weighted_score = (
-                time_score * FLIGHT_QUALITY_WEIGHTS['TIME'] +
-                stops_score * FLIGHT_QUALITY_WEIGHTS['STOPS'] +
-                airline_score * FLIGHT_QUALITY_WEIGHTS['AIRLINE'] +
-                aircraft_score * FLIGHT_QUALITY_WEIGHTS['AIRCRAFT']
+
+    def score_flight_paths(self, paths: List[List[Flight]]) -> np.ndarray:
+        """
+        Flight quality scores of the given paths, as an array in the same order
+        (0 for an empty path).
+
+        One pass over every flight of every path gathers its hour score, stop count
+        and known airline/aircraft scores into a single flat array, and per-path sums
+        are taken as differences of its running totals, so no component needs a
+        per-path Python loop. All the values are integers, so the sums are exact.
+        """
+        segments = np.fromiter((len(path) for path in paths), dtype=np.int64, count=len(paths))
+        flight_values = np.fromiter(chain.from_iterable(
+            (
+                _HOUR_SCORES[f.departure_hour],
+                f.stop_count,
+                0 if f.airline is None else AIRLINE_SCORE_MAP.get(f.airline, 0),
+                f.airline is not None,
+                0 if f.aircraft_type is None else AIRCRAFT_SCORE_MAP.get(f.aircraft_type, 0),
+                f.aircraft_type is not None
             )
-            
-            # Apply segment penalty
-            return max(0, weighted_score * (1 - (num_segments - 1) * 0.1))
-
-        outbound_score = score_flight_path(trip.outbound_path)
-        return_score = score_flight_path(trip.return_path)
-        
-        return (outbound_score * 0.6 + return_score * 0.4)
-
-    def _calculate_time_score(self, flights: List[Flight]) -> float:
-        scores = []
-        for flight in flights:
-            hour = flight.departure_time.hour
-            score = None
-            for time_range, (start, end, value) in FLIGHT_TIME_SCORES.items():
-                if start <= hour <= end:
-                    score = value
-                    break
-            scores.append(score or FLIGHT_TIME_SCORES['OFF_HOURS'][2])
-        return sum(scores) / len(scores)
-
-    def _calculate_airline_score(self, flights: List[Flight]) -> float:
-        scores = []
-        for flight in flights:
-            if hasattr(flight, 'airline'):
-                for tier in AIRLINE_SCORES.values():
-                    if flight.airline in tier['airlines']:
-                        scores.append(tier['score'])
-                        break
-                else:
-                    scores.append(0)
-        return sum(scores) / len(scores) if scores else 0
-
-    def _calculate_aircraft_score(self, flights: List[Flight]) -> float:
-        scores = []
-        for flight in flights:
-            if hasattr(flight, 'aircraft_type'):
-                for category in AIRCRAFT_SCORES.values():
-                    if flight.aircraft_type in category['types']:
-                        scores.append(category['score'])
-                        break
-                else:
-                    scores.append(0)
-        return sum(scores) / len(scores) if scores else 0
-
-    def _calculate_hotel_score(self, trip: TripPackage) -> float:
-        if not hasattr(trip, 'hotel') or not trip.hotel:
-            return 0
-        
-        # Base scores
-        stars_score = min(40, trip.hotel.stars * HOTEL_WEIGHTS['STARS_MULTIPLIER'])
-        rating_score = min(30, trip.hotel.rating * HOTEL_WEIGHTS['RATING_MULTIPLIER'])
-        
-        # Enhanced amenity scoring using HOTEL_AMENITY_SCORES
-        amenity_score = 0
-        for amenity in trip.hotel.amenities:
-            for category in HOTEL_AMENITY_SCORES.values():
-                if amenity.upper() in category:
-                    amenity_score += category[amenity.upper()]
-        amenity_score = min(30, amenity_score * HOTEL_WEIGHTS['AMENITY_MULTIPLIER'] / 100)
-        
-        total_score = stars_score + rating_score + amenity_score
-        return min(MAX_HOTEL_SCORE, total_score)
\ No newline at end of file
+            for path in paths for f in path
+        ), dtype=np.float64).reshape(-1, 6)
+
+        ends = np.cumsum(segments)
+        running_totals = np.concatenate((np.zeros((1, 6)), np.cumsum(flight_values, axis=0)))
+        hour_totals, stop_totals, airline_totals, airline_counts, aircraft_totals, aircraft_counts = (
+            running_totals[ends] - running_totals[ends - segments]
+        ).T
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            time_scores = hour_totals / segments
+            # Airline and aircraft scores average over the flights they are known for
+            airline_scores = np.where(airline_counts > 0, airline_totals / airline_counts, 0)
+            aircraft_scores = np.where(aircraft_counts > 0, aircraft_totals / aircraft_counts, 0)
+        stops_scores = 100 - stop_totals * STOP_PENALTY
+
+        weighted_scores = (
+            time_scores * _W_TIME +
+            stops_scores * _W_STOPS +
+            airline_scores * _W_AIRLINE +
+            aircraft_scores * _W_AIRCRAFT
+        )
+        scores = np.maximum(0, weighted_scores * (1 - (segments - 1) * 0.1))
+        return np.where(segments > 0, scores, 0)
+
+    def score_hotels(self, hotels: List[Hotel]) -> np.ndarray:
+        """Scores of the given hotels, as an array in the same order"""
+        n = len(hotels)
+        stars = np.fromiter((h.stars for h in hotels), dtype=np.float64, count=n)
+        ratings = np.fromiter((h.rating for h in hotels), dtype=np.float64, count=n)
+        amenity_points = np.fromiter((self._amenity_points(h) for h in hotels), dtype=np.float64, count=n)
+
+        stars_scores = np.minimum(40, stars * _HOTEL_STARS_MULT)
+        rating_scores = np.minimum(30, ratings * _HOTEL_RATING_MULT)
+        amenity_scores = np.minimum(30, amenity_points * _HOTEL_AMENITY_MULT / 100)
+        return np.minimum(MAX_HOTEL_SCORE, stars_scores + rating_scores + amenity_scores)
+
+    def _amenity_points(self, hotel: Hotel) -> int:
+        # Depends only on the hotel, so it is summed once and kept on the hotel
+        points = hotel.amenity_points
+        if points is None:
+            points = sum(_AMENITY_POINTS.get(amenity.upper(), 0) for amenity in hotel.amenities)
+            object.__setattr__(hotel, 'amenity_points', points)
+        return points
@@ -1,5 +1,6 @@
 from typing import List
 from ...models.domain import Flight, Hotel
+from .criteria import SearchCriteria
 from .index_manager import TravelIndexManager
 from .trip_search import TripSearch
 from ..scoring.trip_scorer import TripScorer
@@ -18,9 +19,7 @@ class TravelSearchEngine:
         )
 
     async def search_trips(self, **kwargs):
-        from .criteria import SearchCriteria
-        criteria = SearchCriteria(**kwargs)
-        return await self.search_engine.search(criteria)
+        return await self.search_engine.search(SearchCriteria(**kwargs))
 
-    def invalidate_cache(self):
-        self.cache.invalidate_pattern("search_trips:*")
\ No newline at end of file
+    async def invalidate_cache(self):
+        await self.cache.invalidate_pattern("search_trips:*")
\ No newline at end of file
@@ -1,11 +1,19 @@
+import heapq
+import math
 from typing import Dict, List, Tuple
+import numpy as np
 from ...models.domain import Flight, Hotel
 
 class TravelIndexManager:
     def __init__(self, flights: List[Flight], hotels: List[Hotel]):
         self.flights_by_route = self._index_flights(flights)
+        self.routes_by_origin = self._index_routes_by_origin(self.flights_by_route)
         self.hotels_by_city = self._index_hotels(hotels)
+        self._build_city_hotel_columns()
+        self._compute_price_stats()
         self._compute_destination_stats()
+        self._compute_price_bounds()
+        self._index_cheapest_arrivals()
 
     def _index_flights(self, flights: List[Flight]) -> Dict[Tuple[str, str], List[Flight]]:
         indexed = {}
@@ -16,6 +24,16 @@ class TravelIndexManager:
             indexed[key].append(flight)
         return indexed
 
+    @staticmethod
+    def _index_routes_by_origin(flights_by_route: Dict[Tuple[str, str], List[Flight]]) -> Dict[str, Dict[str, List[Flight]]]:
+        """origin -> {destination: flights}, keeping flights_by_route's first-seen order"""
+        indexed = {}
+        for (origin, destination), route_flights in flights_by_route.items():
+            if origin not in indexed:
+                indexed[origin] = {}
+            indexed[origin][destination] = route_flights
+        return indexed
+
     def _index_hotels(self, hotels: List[Hotel]) -> Dict[str, List[Hotel]]:
         indexed = {}
         for hotel in hotels:
@@ -24,6 +42,35 @@ class TravelIndexManager:
             indexed[hotel.city_code].append(hotel)
         return indexed
 
+    def _compute_price_stats(self):
+        """Dataset-wide price figures for the search context; None when there is no data"""
+        flight_prices = [flight.price for flights in self.flights_by_route.values() for flight in flights]
+        hotel_prices = [hotel.price_per_night for hotels in self.hotels_by_city.values() for hotel in hotels]
+        self.max_flight_price = max(flight_prices) if flight_prices else None
+        self.max_hotel_price = max(hotel_prices) if hotel_prices else None
+        self.avg_flight_price = sum(flight_prices) / len(flight_prices) if flight_prices else None
+
+    def _build_city_hotel_columns(self):
+        """Per-city float64 price and rating columns, parallel to hotels_by_city"""
+        self.city_hotel_columns: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            city: (
+                np.fromiter((h.price_per_night for h in city_hotels), dtype=np.float64, count=len(city_hotels)),
+                np.fromiter((h.rating for h in city_hotels), dtype=np.float64, count=len(city_hotels))
+            )
+            for city, city_hotels in self.hotels_by_city.items()
+        }
+
+    def hotel_columns(self, city: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Price and rating columns of the city's hotels, in hotels_by_city order"""
+        columns = self.city_hotel_columns.get(city)
+        if columns is None:
+            return np.empty(0), np.empty(0)
+        return columns
+
+    def destinations_from(self, origin: str) -> List[str]:
+        """Destinations with a direct flight from origin, in first-seen flight order"""
+        return list(self.routes_by_origin.get(origin, ()))
+
     def _compute_destination_stats(self):
         self.destination_popularity = {}
         for (_, dest), flights in self.flights_by_route.items():
@@ -36,3 +83,62 @@ class TravelIndexManager:
             dest: count / max_popularity
             for dest, count in self.destination_popularity.items()
         }
+
+    def _compute_price_bounds(self):
+        """Cheapest departing flight, arriving flight and hotel night per city"""
+        self.min_departure_price: Dict[str, float] = {}
+        self.min_arrival_price: Dict[str, float] = {}
+        for (origin, dest), flights in self.flights_by_route.items():
+            cheapest = min(flight.price for flight in flights)
+            if cheapest < self.min_departure_price.get(origin, math.inf):
+                self.min_departure_price[origin] = cheapest
+            if cheapest < self.min_arrival_price.get(dest, math.inf):
+                self.min_arrival_price[dest] = cheapest
+        self.min_hotel_price: Dict[str, float] = {
+            city: float(prices.min()) for city, (prices, _) in self.city_hotel_columns.items()
+        }
+
+    def min_trip_cost(self, origin: str, dest: str, nights: int) -> float:
+        """
+        Lower bound on the cost of any origin -> dest -> origin trip with a hotel at dest.
+        Each leg costs at least its cheapest first and last flight, whatever the route.
+        """
+        hotel_price = self.min_hotel_price.get(dest)
+        if hotel_price is None:
+            return math.inf
+        outbound = max(self.min_departure_price.get(origin, math.inf), self.min_arrival_price.get(dest, math.inf))
+        inbound = max(self.min_departure_price.get(dest, math.inf), self.min_arrival_price.get(origin, math.inf))
+        return outbound + inbound + hotel_price * nights
+
+    def _index_cheapest_arrivals(self):
+        """destination -> [(origin, cheapest flight price)] over every route into it"""
+        self.cheapest_arrivals: Dict[str, List[Tuple[str, float]]] = {}
+        for (origin, dest), flights in self.flights_by_route.items():
+            if dest not in self.cheapest_arrivals:
+                self.cheapest_arrivals[dest] = []
+            self.cheapest_arrivals[dest].append((origin, min(flight.price for flight in flights)))
+        self._min_costs_to: Dict[str, Dict[str, float]] = {}
+
+    def min_costs_to(self, target: str) -> Dict[str, float]:
+        """
+        Cheapest total flight price from each city to target (Dijkstra over reversed routes).
+        Cities that cannot reach target are absent. The graph never changes, so each
+        target is computed once.
+        """
+        costs = self._min_costs_to.get(target)
+        if costs is not None:
+            return costs
+
+        costs = {target: 0.0}
+        queue = [(0.0, target)]
+        while queue:
+            cost, city = heapq.heappop(queue)
+            if cost > costs[city]:
+                continue
+            for origin, price in self.cheapest_arrivals.get(city, ()):
+                new_cost = cost + price
+                if new_cost < costs.get(origin, math.inf):
+                    costs[origin] = new_cost
+                    heapq.heappush(queue, (new_cost, origin))
+        self._min_costs_to[target] = costs
+        return costs
@@ -1,18 +1,54 @@
-from collections import deque
-import heapq
+from functools import lru_cache
 import logging
-from typing import List, Dict, Any
+import math
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
 from ...models.domain import Hotel, TripPackage, Flight
 from ..cache import TravelCache
 from .criteria import SearchCriteria
 from .index_manager import TravelIndexManager
 from ..scoring.trip_scorer import TripScorer
-from .criteria import SearchCriteria
-from ...config.config import DEFAULT_CACHE_TTL
+from ...config.config import DEFAULT_CACHE_TTL, ROUTE_BUDGET_STEP, ROUTE_CACHE_SIZE
 
 
 logger = logging.getLogger(__name__)
 
+# Cost cube elements built per block of hotels (256KB of float64 totals)
+_CUBE_BLOCK_SIZE = 1 << 15
+
+# Route pruning compares against a slightly relaxed lower bound, so that summing
+# prices in a different order than the path does can never cut a path that fits
+_BOUND_SLACK = 1 - 1e-9
+
+class _DestinationCombinations(NamedTuple):
+    """
+    A destination's valid combinations, as parallel index arrays into its hotels and
+    routes, along with the per-combination inputs of TripScorer.score_packages
+    """
+    dest: str
+    hotels: List[Hotel]
+    outbound_routes: List[List[Flight]]
+    return_routes: List[List[Flight]]
+    hotel_idx: np.ndarray
+    outbound_idx: np.ndarray
+    return_idx: np.ndarray
+    total_costs: np.ndarray
+    outbound_scores: np.ndarray
+    return_scores: np.ndarray
+    hotel_scores: np.ndarray
+    flight_counts: np.ndarray
+
+    def candidate(self, k: int) -> Tuple:
+        """The k-th combination as a (dest, hotel, outbound_path, return_path, total_cost) tuple"""
+        return (
+            self.dest,
+            self.hotels[self.hotel_idx[k]],
+            self.outbound_routes[self.outbound_idx[k]],
+            self.return_routes[self.return_idx[k]],
+            float(self.total_costs[k])
+        )
+
 class TripSearch:
     def __init__(
         self, 
@@ -23,150 +59,275 @@ class TripSearch:
         self.indexes = index_manager
         self.scorer = scorer
         self.cache = cache
+        self._hotel_scores_by_city: Dict[str, np.ndarray] = {}
+        # Wrapped once here rather than re-decorating a closure on every search
+        self._cached_search = cache.cache_decorator(ttl=DEFAULT_CACHE_TTL, prefix="search_trips")(self._run_search)
+        # The index never changes, so route enumerations stay valid for the instance's lifetime
+        self._cached_routes = lru_cache(maxsize=ROUTE_CACHE_SIZE)(self._find_routes)
 
     async def search(self, criteria: SearchCriteria) -> List[TripPackage]:
-        @self.cache.cache_decorator(ttl=DEFAULT_CACHE_TTL, prefix="search_trips")
-        async def _cached_search(criteria: SearchCriteria):
-            logger.info(f"Starting search: origin={criteria.origin}, nights={criteria.nights}, budget=${criteria.budget:.2f}")
-            context = self._prepare_search_context(criteria)
-            top_trips = []
-            entry_count = 0
+        return await self._cached_search(criteria)
 
-            destinations = set(city for origin_, city in self.indexes.flights_by_route.keys() if origin_ == criteria.origin)
+    async def _run_search(self, criteria: SearchCriteria) -> List[TripPackage]:
+        # The search is CPU-bound; run it in the threadpool so the event loop stays free
+        return await run_in_threadpool(self._search, criteria)
 
-            for dest in destinations:
-                for combo in self._generate_combinations(criteria, dest):
-                    score = self.scorer.calculate_score(combo, context)
-                    combo.score = score
-                    entry = (-score, entry_count, combo)
-                    entry_count += 1
+    def _search(self, criteria: SearchCriteria) -> List[TripPackage]:
+        logger.info("Starting search: origin=%s, nights=%s, budget=$%.2f", criteria.origin, criteria.nights, criteria.budget)
+        batches = []
 
-                    if len(top_trips) < criteria.result_limit:
-                        heapq.heappush(top_trips, entry)
-                    elif entry < top_trips[0]:
-                        heapq.heapreplace(top_trips, entry)
+        # Ordered so the candidate order (and tie-breaking) is deterministic
+        for dest in self.indexes.destinations_from(criteria.origin):
+            # Skip the route search for destinations even the cheapest trip can't fit
+            if self.indexes.min_trip_cost(criteria.origin, dest, criteria.nights) > criteria.budget:
+                continue
+            combinations = self._generate_combinations(criteria, dest)
+            if combinations is not None:
+                batches.append(combinations)
 
-            return [trip for _, _, trip in sorted(top_trips, key=lambda x: (-x[0], x[1]))]
+        # Unknown origins and searches with nothing in budget end here, before any scoring setup
+        if not batches:
+            return []
 
-        return await _cached_search(criteria)
+        # One scoring pass over the combinations of every destination
+        context = self._prepare_search_context(criteria)
+        scores = self.scorer.score_packages(
+            np.concatenate([batch.total_costs for batch in batches]),
+            np.concatenate([batch.outbound_scores for batch in batches]),
+            np.concatenate([batch.return_scores for batch in batches]),
+            np.concatenate([batch.hotel_scores for batch in batches]),
+            np.concatenate([batch.flight_counts for batch in batches]),
+            context
+        )
+        top = self._top_k(scores, criteria.result_limit)
 
-    def _prepare_search_context(self, criteria: SearchCriteria) -> Dict[str, Any]:
-        flight_prices = [f.price for flights in self.indexes.flights_by_route.values() for f in flights]
-        hotel_prices = [h.price_per_night for hotels in self.indexes.hotels_by_city.values() for h in hotels]
+        # Map each winner back to its destination batch; only the survivors
+        # are turned into TripPackage objects
+        sizes = np.array([len(batch.total_costs) for batch in batches])
+        starts = np.cumsum(sizes) - sizes
+        owners = np.searchsorted(starts, top, side='right') - 1
+        return [
+            self._build_package(criteria, batches[owner].candidate(i - starts[owner]), score)
+            for i, owner, score in zip(top.tolist(), owners.tolist(), scores[top].tolist())
+        ]
 
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k highest scores, best first; equal scores keep generation order"""
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        if k < len(scores):
+            # argpartition picks arbitrarily among scores tied with the k-th best, so
+            # take everything above it and fill up with the earliest of the ties
+            kth = -np.partition(-scores, k - 1)[k - 1]
+            above = np.flatnonzero(scores > kth)
+            ties = np.flatnonzero(scores == kth)[:k - len(above)]
+            idx = np.concatenate((above, ties))
+        else:
+            idx = np.arange(len(scores))
+        return idx[np.lexsort((idx, -scores[idx]))]
+
+    @staticmethod
+    def _build_package(criteria: SearchCriteria, candidate: Tuple, score: float) -> TripPackage:
+        dest, hotel, outbound_path, return_path, total_cost = candidate
+        return TripPackage(
+            destination=dest,
+            hotel=hotel,
+            nights=criteria.nights,
+            outbound_path=outbound_path,
+            return_path=return_path,
+            total_cost=total_cost,
+            score=score
+        )
+
+    def _prepare_search_context(self, criteria: SearchCriteria) -> Dict[str, Any]:
+        # The price figures are fixed for the dataset, so the index manager computes them once
+        indexes = self.indexes
         return {
-            "max_flight_price": max(flight_prices) if flight_prices else criteria.budget,
-            "max_hotel_price": max(hotel_prices) if hotel_prices else criteria.budget,
-            "destination_popularity": self.indexes.destination_popularity,
-            "avg_price": sum(flight_prices) / len(flight_prices) if flight_prices else criteria.budget,
+            "max_flight_price": criteria.budget if indexes.max_flight_price is None else indexes.max_flight_price,
+            "max_hotel_price": criteria.budget if indexes.max_hotel_price is None else indexes.max_hotel_price,
+            "destination_popularity": indexes.destination_popularity,
+            "avg_price": criteria.budget if indexes.avg_flight_price is None else indexes.avg_flight_price,
         }
 
-    def _generate_combinations(self, criteria: SearchCriteria, dest: str) -> List[TripPackage]:
-        seen_combinations = set()
-        valid_combinations = []
-        
-        def find_routes(origin: str, final_dest: str, visited: set, current_path: list, cost: float) -> List[List[Flight]]:
-            if cost > criteria.budget:
-                return []
-                
-            if origin == final_dest and current_path:  # Check path not empty
-                return [current_path]
-                
-            routes = []
-            for next_dest, flights in self.indexes.flights_by_route.items():
-                if next_dest[0] == origin and next_dest[1] not in visited:
-                    for flight in flights:
-                        if cost + flight.price <= criteria.budget:
-                            new_visited = visited | {next_dest[1]}
-                            new_paths = find_routes(
-                                next_dest[1], 
-                                final_dest, 
-                                new_visited,
-                                current_path + [flight],
-                                cost + flight.price
-                            )
-                            routes.extend(new_paths)
-            return routes
-        
-        def find_routes_bfs(origin: str, final_dest: str) -> List[List[Flight]]:
-            queue = deque([(origin, [], 0)])  # (city, path, cost)
-            routes = []
-            visited = set([origin])
-            
-            while queue:
-                current_city, path, cost = queue.popleft()
-                
-                if current_city == final_dest and path:
-                    routes.append(path)
+    def _routes_within(self, origin: str, final_dest: str, criteria: SearchCriteria) -> Tuple[List[List[Flight]], np.ndarray]:
+        """
+        Every simple flight path from origin to final_dest within the criteria's budget and
+        max_stops, in DFS order, with their costs. Enumeration is shared by all budgets in
+        the same ROUTE_BUDGET_STEP bucket: the bucket's routes are found once for its upper
+        end and then cut down to this budget, which keeps exactly the routes (and order) a
+        search at this budget would find.
+        """
+        budget_ceiling = criteria.budget
+        if math.isfinite(budget_ceiling):  # An unlimited budget is its own bucket
+            budget_ceiling = max(math.ceil(budget_ceiling / ROUTE_BUDGET_STEP) * ROUTE_BUDGET_STEP, budget_ceiling)
+        routes, costs = self._cached_routes(origin, final_dest, budget_ceiling, criteria.max_stops)
+        keep = np.flatnonzero(costs <= criteria.budget)
+        if len(keep) == len(routes):
+            return routes, costs
+        return [routes[i] for i in keep.tolist()], costs[keep]
+
+    def _find_routes(self, origin: str, final_dest: str, budget: float, max_stops: Optional[int]) -> Tuple[List[List[Flight]], np.ndarray]:
+        """Every simple flight path from origin to final_dest within budget, in DFS order, with their costs"""
+        # Cheapest way to finish from each city; branches that can't finish in budget are cut
+        min_costs = self.indexes.min_costs_to(final_dest)
+        routes = []
+        costs = []
+        path = []  # Extended and backtracked in place; copied only when a route completes
+        visited = {origin}
+        # A trip's stops are its two routes' stops together, so no single route may exceed max_stops
+        stop_limit = math.inf if max_stops is None else max_stops
+
+        def extend(city: str, cost: float, stops: int):
+            if city == final_dest and path:  # Check path not empty
+                routes.append(path.copy())
+                costs.append(cost)
+                return
+
+            for next_city, flights in self.indexes.routes_by_origin.get(city, {}).items():
+                remaining = min_costs.get(next_city)
+                if next_city in visited or remaining is None:
                     continue
-                    
-                for next_dest, flights in self.indexes.flights_by_route.items():
-                    if next_dest[0] == current_city and next_dest[1] not in visited:
-                        for flight in flights:
-                            new_cost = cost + flight.price
-                            if new_cost <= criteria.budget:
-                                visited.add(next_dest[1])
-                                queue.append((next_dest[1], path + [flight], new_cost))
-                                
-            return routes
-
-        # outbound_routes = find_routes_bfs(criteria.origin, dest) BFS for shortest path
-        # return_routes = find_routes_bfs(dest, criteria.origin) BFS for shortest path
-        
-        outbound_routes = find_routes(criteria.origin, dest, {criteria.origin}, [], 0) # DFS for all paths for varied outputs
-        return_routes = find_routes(dest, criteria.origin, {dest}, [], 0) # DFS for all paths for varied outputs
-
-        hotels = self._filter_valid_hotels(
-            self.indexes.hotels_by_city.get(dest, []),
-            criteria.budget,
-            criteria.nights
+                visited.add(next_city)
+                for flight in flights:
+                    new_cost = cost + flight.price
+                    new_stops = stops + flight.stop_count
+                    if (new_cost <= budget and new_cost + remaining * _BOUND_SLACK <= budget
+                            and new_stops <= stop_limit):
+                        path.append(flight)
+                        extend(next_city, new_cost, new_stops)
+                        path.pop()
+                visited.remove(next_city)
+
+        extend(origin, 0, 0)
+        return routes, np.array(costs, dtype=np.float64)
+
+    def _generate_combinations(self, criteria: SearchCriteria, dest: str) -> Optional[_DestinationCombinations]:
+        """
+        Find every within-budget (outbound, return, hotel) combination for dest,
+        or None if there is none.
+        """
+        outbound_routes, outbound_costs = self._routes_within(criteria.origin, dest, criteria) # DFS for all paths for varied outputs
+        return_routes, return_costs = self._routes_within(dest, criteria.origin, criteria) # DFS for all paths for varied outputs
+
+        city_hotels = self.indexes.hotels_by_city.get(dest, [])
+        hotel_positions, hotel_costs = self._filter_valid_hotels(dest, criteria)
+        hotels = [city_hotels[i] for i in hotel_positions.tolist()]
+
+        # Drop hotels and routes that exceed the budget even with the cheapest of the
+        # other two parts, so the cube below only spans combinations that can fit.
+        # The sums are added in the cube's order, and filtering keeps relative order.
+        if len(outbound_costs) and len(return_costs) and len(hotel_costs):
+            min_outbound, min_return, min_hotel = outbound_costs.min(), return_costs.min(), hotel_costs.min()
+            keep_outbound = np.flatnonzero(outbound_costs + min_return + min_hotel <= criteria.budget)
+            keep_return = np.flatnonzero(min_outbound + return_costs + min_hotel <= criteria.budget)
+            keep_hotels = np.flatnonzero(min_outbound + min_return + hotel_costs <= criteria.budget)
+            outbound_routes = [outbound_routes[i] for i in keep_outbound.tolist()]
+            return_routes = [return_routes[i] for i in keep_return.tolist()]
+            hotels = [hotels[i] for i in keep_hotels.tolist()]
+            hotel_positions = hotel_positions[keep_hotels]
+            outbound_costs, return_costs, hotel_costs = outbound_costs[keep_outbound], return_costs[keep_return], hotel_costs[keep_hotels]
+
+        stops_ok = None
+        if criteria.max_stops is not None:
+            outbound_stops = np.array([sum(f.stop_count for f in path) for path in outbound_routes], dtype=np.int64)
+            return_stops = np.array([sum(f.stop_count for f in path) for path in return_routes], dtype=np.int64)
+            stops_ok = outbound_stops[:, None] + return_stops[None, :] <= criteria.max_stops
+
+        hotel_idx, outbound_idx, return_idx, total_costs = self._valid_combinations(
+            hotel_costs, outbound_costs, return_costs, stops_ok, criteria.budget
         )
+        if len(hotel_idx) and self._has_duplicate_keys(hotels, outbound_routes, return_routes):
+            keep = self._first_occurrences(hotels, outbound_routes, return_routes, hotel_idx, outbound_idx, return_idx)
+            hotel_idx, outbound_idx, return_idx, total_costs = hotel_idx[keep], outbound_idx[keep], return_idx[keep], total_costs[keep]
 
-        for hotel in hotels:
-            if criteria.min_hotel_rating and hotel.rating < criteria.min_hotel_rating:
-                continue
+        if not len(hotel_idx):
+            return None
 
-            hotel_cost = hotel.price_per_night * criteria.nights
-            
-            for outbound_path in outbound_routes:
-                outbound_cost = sum(f.price for f in outbound_path)
-                if outbound_cost + hotel_cost > criteria.budget:
-                    continue
-                    
-                for return_path in return_routes:
-                    total_cost = outbound_cost + sum(f.price for f in return_path) + hotel_cost
-                    if total_cost > criteria.budget:
-                        continue
-
-                    if criteria.max_stops is not None:
-                        total_stops = sum(len(f.stops) for f in outbound_path + return_path)
-                        if total_stops > criteria.max_stops:
-                            continue
-
-                    trip = TripPackage(
-                        destination=dest,
-                        outbound_flight=outbound_path[0],  # First flight of path
-                        return_flight=return_path[0],      # First flight of path 
-                        hotel=hotel,
-                        nights=criteria.nights,
-                        total_cost=total_cost,
-                        outbound_path=outbound_path,       # Add full paths
-                        return_path=return_path
-                    )
-
-                    combo_key = f"{'-'.join(f.id for f in outbound_path)}_{'-'.join(f.id for f in return_path)}_{hotel.id}"
-                    if combo_key not in seen_combinations:
-                        seen_combinations.add(combo_key)
-                        trip.score = self.scorer.calculate_score(trip, self._prepare_search_context(criteria))
-                        valid_combinations.append(trip)
-
-        return valid_combinations
-
-    def _filter_valid_hotels(self, hotels: List[Hotel], budget: float, nights: int) -> List[Hotel]:
-        return [hotel for hotel in hotels if hotel.price_per_night * nights <= budget]
-    
-    def _calculate_total_cost(self, trip: TripPackage) -> float:
-        return trip.outbound_flight.price + trip.return_flight.price + trip.hotel.price_per_night * trip.nights
-
-    def _is_within_budget(self, trip: TripPackage, budget: float) -> bool:
-        return self._calculate_total_cost(trip) <= budget
\ No newline at end of file
+        outbound_scores = self.scorer.score_flight_paths(outbound_routes)
+        return_scores = self.scorer.score_flight_paths(return_routes)
+        hotel_scores = self._city_hotel_scores(dest)[hotel_positions]
+        outbound_lengths = np.array([len(path) for path in outbound_routes], dtype=np.int64)
+        return_lengths = np.array([len(path) for path in return_routes], dtype=np.int64)
+
+        return _DestinationCombinations(
+            dest, hotels, outbound_routes, return_routes,
+            hotel_idx, outbound_idx, return_idx, total_costs,
+            outbound_scores[outbound_idx],
+            return_scores[return_idx],
+            hotel_scores[hotel_idx],
+            outbound_lengths[outbound_idx] + return_lengths[return_idx]
+        )
+
+    @staticmethod
+    def _valid_combinations(hotel_costs: np.ndarray, outbound_costs: np.ndarray, return_costs: np.ndarray,
+                            stops_ok: Optional[np.ndarray], budget: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Hotel, outbound and return indices of the within-budget combinations, plus their
+        total costs, in the order the hotel -> outbound -> return loops would visit them.
+
+        The (H, O, R) cost cube is built a block of hotels at a time, so its working set
+        stays cache-sized however many routes the destination has.
+        """
+        route_costs = outbound_costs[:, None] + return_costs[None, :]
+        block = max(1, _CUBE_BLOCK_SIZE // max(route_costs.size, 1))
+        parts = []
+        for start in range(0, len(hotel_costs), block):
+            block_costs = hotel_costs[start:start + block]
+            totals = route_costs[None, :, :] + block_costs[:, None, None]
+            valid = totals <= budget
+            valid &= (outbound_costs[None, :] + block_costs[:, None] <= budget)[:, :, None]
+            if stops_ok is not None:
+                valid &= stops_ok
+            hotel_idx, outbound_idx, return_idx = np.nonzero(valid)
+            parts.append((hotel_idx + start, outbound_idx, return_idx, totals[hotel_idx, outbound_idx, return_idx]))
+
+        if not parts:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty, empty, np.empty(0)
+        return tuple(np.concatenate(column) for column in zip(*parts))
+
+    @staticmethod
+    def _has_duplicate_keys(hotels: List[Hotel], outbound_routes: List[List[Flight]], return_routes: List[List[Flight]]) -> bool:
+        """Whether any two hotels share an id or any two routes the same flight ids"""
+        for keys in (
+            [hotel.id for hotel in hotels],
+            [tuple(f.id for f in path) for path in outbound_routes],
+            [tuple(f.id for f in path) for path in return_routes],
+        ):
+            if len(set(keys)) != len(keys):
+                return True
+        return False
+
+    @staticmethod
+    def _first_occurrences(hotels: List[Hotel], outbound_routes: List[List[Flight]], return_routes: List[List[Flight]],
+                           hotel_idx: np.ndarray, outbound_idx: np.ndarray, return_idx: np.ndarray) -> np.ndarray:
+        """Mask keeping only the first valid combination for each (outbound ids, return ids, hotel id) key"""
+        seen_combinations = set()
+        keep = np.zeros(len(hotel_idx), dtype=bool)
+        for k, (h, i, j) in enumerate(zip(hotel_idx.tolist(), outbound_idx.tolist(), return_idx.tolist())):
+            combo_key = (tuple(f.id for f in outbound_routes[i]), tuple(f.id for f in return_routes[j]), hotels[h].id)
+            if combo_key not in seen_combinations:
+                seen_combinations.add(combo_key)
+                keep[k] = True
+        return keep
+
+    def _city_hotel_scores(self, city: str) -> np.ndarray:
+        """Scores of the city's hotels in hotels_by_city order; they never change, so each city is scored once"""
+        scores = self._hotel_scores_by_city.get(city)
+        if scores is None:
+            scores = self._hotel_scores_by_city[city] = self.scorer.score_hotels(self.indexes.hotels_by_city.get(city, []))
+        return scores
+
+    def _filter_valid_hotels(self, city: str, criteria: SearchCriteria) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Positions in hotels_by_city[city] of the hotels within budget and rating, and their
+        stay costs, as masks over the city's prebuilt price/rating columns.
+        """
+        prices, ratings = self.indexes.hotel_columns(city)
+        costs = prices * criteria.nights
+        valid = costs <= criteria.budget
+        if criteria.min_hotel_rating:
+            valid &= ratings >= criteria.min_hotel_rating
+        positions = np.flatnonzero(valid)
+        return positions, costs[positions]
@@ -1,11 +1,17 @@
 # app/services/stats.py
+import asyncio
 from collections import Counter, defaultdict
 from datetime import datetime
 import logging
-from typing import Dict, List, Set, Optional, Union
+from typing import Any, Dict, List, Set, Optional, Union
+from ..config.config import STATS_QUEUE_MAXSIZE, STATS_BATCH_SIZE
 
 logger = logging.getLogger(__name__)
 
+def _new_route_totals() -> Dict[str, float]:
+    # Aggregates are kept as running totals so memory and report time don't grow with traffic
+    return {"searches": 0, "time_sum": 0.0, "budget_sum": 0.0, "timed": 0}
+
 class SearchStats:
     """
     Tracks and analyzes search statistics for the travel search system.
@@ -21,8 +27,7 @@ class SearchStats:
         failed_searches (int): Number of searches that found no results
         popular_origins (Counter): Counter tracking popular origin locations
         popular_destinations (Counter): Counter tracking popular destinations
-        search_times_by_route (defaultdict): Dictionary tracking search durations by route
-        average_budgets (defaultdict): Dictionary tracking budget statistics by route
+        route_totals (defaultdict): Running search count, duration and budget totals by route
         unique_users (Set[str]): Set of unique user identifiers
         last_reset (datetime): Timestamp of the last statistics reset
     """
@@ -37,8 +42,7 @@ class SearchStats:
         self.failed_searches = 0
         self.popular_origins = Counter()
         self.popular_destinations = Counter()
-        self.search_times_by_route = defaultdict(list)
-        self.average_budgets = defaultdict(list)
+        self.route_totals = defaultdict(_new_route_totals)
         self.unique_users: Set[str] = set()
         self.last_reset = datetime.now()
 
@@ -89,9 +93,28 @@ class SearchStats:
         self.popular_origins[origin] += 1
         for dest in destinations:
             self.popular_destinations[dest] += 1
-            route = f"{origin}-{dest}"
-            self.search_times_by_route[route].append(duration_ms)
-            self.average_budgets[route].append(budget)
+            totals = self.route_totals[f"{origin}-{dest}"]
+            totals["searches"] += 1
+            totals["time_sum"] += duration_ms
+            totals["budget_sum"] += budget
+            if duration_ms > 0:
+                totals["timed"] += 1
+
+    def log_search_batch(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Log several searches at once.
+
+        A record that fails to log is reported and skipped; the rest of the
+        batch is still applied.
+
+        Args:
+            records: Keyword arguments for log_search, one dict per search
+        """
+        for record in records:
+            try:
+                self.log_search(**record)
+            except Exception as e:
+                logger.error("Failed to log search statistics for %s: %s", record, e, exc_info=True)
 
     def get_stats_report(self) -> Dict[str, Union[Dict, List]]:
         """
@@ -153,13 +176,14 @@ class SearchStats:
             average time, average budget, and success rate.
         """
         route_stats = {}
-        for route, times in self.search_times_by_route.items():
-            avg_time = sum(times) / len(times)
-            avg_budget = sum(self.average_budgets[route]) / len(self.average_budgets[route])
-            success_rate = len([t for t in times if t > 0]) / len(times)
+        for route, totals in self.route_totals.items():
+            searches = totals["searches"]
+            avg_time = totals["time_sum"] / searches
+            avg_budget = totals["budget_sum"] / searches
+            success_rate = totals["timed"] / searches
             
             route_stats[route] = {
-                "searches": len(times),
+                "searches": searches,
                 "avg_time_ms": round(avg_time, 2),
                 "avg_budget": round(avg_budget, 2),
                 "success_rate": round(success_rate * 100, 1)
@@ -182,4 +206,68 @@ class SearchStats:
         Reset all statistics counters and metrics to their initial state.
         This includes clearing all counters, lists, and setting the reset timestamp.
         """
-        self.__init__()
\ No newline at end of file
+        self.__init__()
+
+
+class SearchStatsQueue:
+    """
+    Buffers search records and applies them to SearchStats from a background task.
+
+    Request handlers only enqueue a record, so they never wait on statistics
+    bookkeeping. A drain task pulls records in batches of up to ``batch_size``
+    and hands them to ``SearchStats.log_search_batch``. When the queue is full
+    new records are dropped and counted instead of slowing down the request.
+
+    Attributes:
+        stats (SearchStats): Statistics collector the records are applied to
+        dropped (int): Number of records discarded because the queue was full
+    """
+
+    def __init__(self,
+                 stats: SearchStats,
+                 maxsize: int = STATS_QUEUE_MAXSIZE,
+                 batch_size: int = STATS_BATCH_SIZE):
+        self.stats = stats
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, **record: Any) -> None:
+        """Enqueue one search record (same keywords as SearchStats.log_search)."""
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def start(self) -> None:
+        """Start the background drain task on the running event loop."""
+        self._task = asyncio.create_task(self._drain())
+
+    async def stop(self) -> None:
+        """Stop the drain task and apply any records still queued."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._flush()
+
+    async def _drain(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            self._apply(batch)
+
+    def _flush(self) -> None:
+        batch = []
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        if batch:
+            self._apply(batch)
+
+    def _apply(self, batch: List[Dict[str, Any]]) -> None:
+        self.stats.log_search_batch(batch)
@@ -1,81 +1,132 @@
-from typing import List, Dict
-from datetime import datetime
+from sys import intern
+from typing import Any, List, Dict, Tuple
 import logging
+import numpy as np
 from .search.engine import TravelSearchEngine
 from ..models.multi_city import MultiCityFlight, MultiCitySearchEngine
 from ..models.domain import Flight, Hotel
+from ..config.config import MIN_NIGHTS, MAX_NIGHTS
 
 logger = logging.getLogger(__name__)
 
+def _parse_hhmm(s: str) -> int:
+    """Parse an 'HH:MM' string into minutes since midnight"""
+    if len(s) == 5 and s[2] == ':' and s.isascii() and s[:2].isdigit() and s[3:].isdigit():
+        hours = (ord(s[0]) - 48) * 10 + (ord(s[1]) - 48)
+        minutes = (ord(s[3]) - 48) * 10 + (ord(s[4]) - 48)
+        if hours < 24 and minutes < 60:
+            return hours * 60 + minutes
+    raise ValueError(f"time data {s!r} does not match format 'HH:MM'")
+
+def _coerce_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def _coerce_int(value: Any) -> float:
+    # int() semantics, as the Hotel constructor call had: 4.7 -> 4, but '4.5' is invalid
+    try:
+        return float(int(value))
+    except (TypeError, ValueError, OverflowError):
+        return np.nan
+
+def _numeric_column(values: List[Any]) -> np.ndarray:
+    """Convert a raw column to float64, mapping unparseable entries to NaN"""
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        # Only dirty data pays for the per-value fallback
+        return np.array([_coerce_float(v) for v in values], dtype=np.float64)
+
+def _is_str_list(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+def _validate_hotels(raw_hotels: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Validate all raw hotel rows at once, mirroring the Hotel field constraints.
+    Returns the validity mask along with the parsed stars, rating and price columns.
+    """
+    stars = np.array([_coerce_int(h.get('stars')) for h in raw_hotels], dtype=np.float64)
+    rating = _numeric_column([h.get('rating') for h in raw_hotels])
+    price = _numeric_column([h.get('price_per_night') for h in raw_hotels])
+    city_len = np.array([len(c) if isinstance(c, str) else 0 for c in (h.get('city_code') for h in raw_hotels)])
+    has_fields = np.array([
+        isinstance(h.get('id'), str) and isinstance(h.get('name'), str) and _is_str_list(h.get('amenities'))
+        for h in raw_hotels
+    ], dtype=bool)
+
+    with np.errstate(invalid='ignore'):
+        valid = (
+            has_fields
+            & (stars >= 1) & (stars <= 5)
+            & (rating >= 0)
+            & np.isfinite(price) & (price > 0)
+            & (city_len >= MIN_NIGHTS) & (city_len <= MAX_NIGHTS)
+        )
+    return valid, stars, np.minimum(rating, 5.0), price
+
+def parse_flight(f: Dict) -> Dict[str, Any]:
+    """Parse one raw flight record into Flight/MultiCityFlight constructor fields"""
+    return dict(
+        id=f['id'],
+        origin=intern(f['from']),
+        destination=intern(f['to']),
+        departure_time=_parse_hhmm(f['departure_time']),
+        arrival_time=_parse_hhmm(f['arrival_time']),
+        price=float(f['price']),
+        stops=tuple(intern(stop) for stop in f.get('stops') or ()),
+        departure_label=f['departure_time'],
+        arrival_label=f['arrival_time']
+    )
+
+def parse_hotels(raw_hotels: List[Dict]) -> Tuple[List[Hotel], Dict[str, List[Hotel]]]:
+    """Validate and build the hotels, returning them as a list and grouped by city"""
+    valid, stars, ratings, prices = _validate_hotels(raw_hotels)
+
+    invalid_ids = [h.get('id') for h, ok in zip(raw_hotels, valid) if not ok]
+    if invalid_ids:
+        logger.warning("Skipping %d invalid hotels: %s", len(invalid_ids), invalid_ids)
+
+    hotels = []
+    hotels_by_city = {}
+    amenity_tuples = {}  # Identical amenity tuples are shared between hotels
+    for i in np.flatnonzero(valid):
+        h = raw_hotels[i]
+        amenities_key = tuple(h['amenities'])
+        amenities = amenity_tuples.get(amenities_key)
+        if amenities is None:
+            amenities = amenity_tuples[amenities_key] = tuple(intern(a) for a in amenities_key)
+
+        hotel = Hotel(
+            id=h['id'],
+            name=h['name'],
+            city_code=intern(h['city_code']),
+            stars=int(stars[i]),
+            rating=float(ratings[i]),
+            price_per_night=float(prices[i]),
+            amenities=amenities
+        )
+        hotels.append(hotel)
+        if hotel.city_code not in hotels_by_city:
+            hotels_by_city[hotel.city_code] = []
+        hotels_by_city[hotel.city_code].append(hotel)
+
+    return hotels, hotels_by_city
+
 class TravelAPI:
     def __init__(self, flights: List[Dict], hotels: List[Dict]):
-        self.search_engine = self._initialize_engine(flights, hotels)
-        self.multi_city_engine = self._initialize_multi_city_engine(flights, hotels)
-    
-    def _initialize_engine(self, raw_flights: List[Dict], raw_hotels: List[Dict]) -> TravelSearchEngine:
-        flights = [
-            Flight(
-                id=f['id'],
-                origin=f['from'],
-                destination=f['to'],
-                departure_time=datetime.strptime(f['departure_time'], '%H:%M'),
-                arrival_time=datetime.strptime(f['arrival_time'], '%H:%M'),
-                price=float(f['price']),
-                stops=f.get('stops', [])
-            ) for f in raw_flights['flights']
-        ]
-        
-        hotels = []
-        for h in raw_hotels:
-            try:
-                hotel = Hotel(
-                    id=h['id'],
-                    name=h['name'],
-                    city_code=h['city_code'],
-                    stars=int(h['stars']),
-                    rating=min(float(h['rating']), 5.0),
-                    price_per_night=float(h['price_per_night']),
-                    amenities=h['amenities']
-                )
-                hotels.append(hotel)
-            except ValueError as e:
-                logger.warning(f"Skipping invalid hotel {h['id']}: {str(e)}")
-                continue
-        
+        # Parse the raw data once and feed both engines from the same result
+        parsed_flights = [parse_flight(f) for f in flights['flights']]
+        parsed_hotels, hotels_by_city = parse_hotels(hotels)
+
+        self.search_engine = self._initialize_engine(parsed_flights, parsed_hotels)
+        self.multi_city_engine = self._initialize_multi_city_engine(parsed_flights, hotels_by_city)
+
+    def _initialize_engine(self, parsed_flights: List[Dict[str, Any]], hotels: List[Hotel]) -> TravelSearchEngine:
+        flights = [Flight(**fields) for fields in parsed_flights]
         return TravelSearchEngine(flights, hotels)
 
-    def _initialize_multi_city_engine(self, raw_flights: List[Dict], raw_hotels: List[Dict]) -> MultiCitySearchEngine:
-        flights = [
-            MultiCityFlight(
-                id=f['id'],
-                origin=f['from'],
-                destination=f['to'],
-                departure_time=datetime.strptime(f['departure_time'], '%H:%M'),
-                arrival_time=datetime.strptime(f['arrival_time'], '%H:%M'),
-                price=float(f['price']),
-                stops=f.get('stops', [])
-            ) for f in raw_flights['flights'] 
-        ]
-        
-        hotels_by_city = {}
-        for h in raw_hotels:
-            try:
-                city_code = h['city_code']
-                if city_code not in hotels_by_city:
-                    hotels_by_city[city_code] = []
-                
-                hotel = Hotel(
-                    id=h['id'],
-                    name=h['name'],
-                    city_code=city_code,
-                    stars=int(h['stars']),
-                    rating=min(float(h['rating']), 5.0),
-                    price_per_night=float(h['price_per_night']),
-                    amenities=h['amenities']
-                )
-                hotels_by_city[city_code].append(hotel)
-            except ValueError as e:
-                logger.warning(f"Skipping invalid hotel {h['id']}: {str(e)}")
-                continue
-        
-        return MultiCitySearchEngine(flights, hotels_by_city)
\ No newline at end of file
+    def _initialize_multi_city_engine(self, parsed_flights: List[Dict[str, Any]], hotels_by_city: Dict[str, List[Hotel]]) -> MultiCitySearchEngine:
+        flights = [MultiCityFlight(**fields) for fields in parsed_flights]
+        return MultiCitySearchEngine(flights, hotels_by_city)
@@ -0,0 +1,2 @@
+# Puts the repository root on sys.path so the tests can import the app package
+# however pytest is invoked (e.g. `pytest test/` in CI)
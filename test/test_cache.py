@@ -0,0 +1,179 @@
+import asyncio
+
+import pytest
+
+# The search package is imported first, as the app does; cache.py imports from it
+from app.services.search.criteria import SearchCriteria
+from app.services import cache as cache_module
+from app.services.cache import TravelCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def local_cache() -> TravelCache:
+    # Exercise the in-process tier on its own; a None client is how the cache runs without Redis
+    cache = TravelCache()
+    cache.redis_client = None
+    return cache
+
+
+def _criteria(budget: float = 1000) -> SearchCriteria:
+    return SearchCriteria(origin="JFK", nights=3, budget=budget)
+
+
+def test_local_entries_expire(local_cache, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    monkeypatch.setattr(cache_module, "LOCAL_CACHE_TTL", 60)
+
+    local_cache._local_set("short", ["a"], ttl=10)
+    local_cache._local_set("long", ["b"], ttl=3600)
+    clock.now += 10
+    assert local_cache._local_get("short") == ["a"]
+
+    clock.now += 1
+    assert local_cache._local_get("short") is None
+    assert "short" not in local_cache.local_cache
+    # Local entries never outlive LOCAL_CACHE_TTL, whatever the Redis TTL
+    assert local_cache._local_get("long") == ["b"]
+    clock.now += 50
+    assert local_cache._local_get("long") is None
+
+
+def test_local_cache_evicts_least_recently_used(local_cache, monkeypatch):
+    monkeypatch.setattr(cache_module, "LOCAL_CACHE_MAX_ENTRIES", 2)
+
+    local_cache._local_set("a", [1], ttl=60)
+    local_cache._local_set("b", [2], ttl=60)
+    assert local_cache._local_get("a") == [1]  # "b" is now the least recently used
+    local_cache._local_set("c", [3], ttl=60)
+
+    assert list(local_cache.local_cache) == ["a", "c"]
+    assert local_cache._local_get("b") is None
+
+
+def test_concurrent_misses_share_one_search(local_cache):
+    calls = 0
+
+    async def scenario():
+        release = asyncio.Event()
+
+        @local_cache.cache_decorator(prefix="search_trips")
+        async def search(criteria):
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return []
+
+        tasks = [asyncio.create_task(search(_criteria())) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert list(local_cache._inflight) == ["search_trips:origin=JFK:nights=3:budget=1000"]
+        release.set()
+        results = await asyncio.gather(*tasks)
+        # Later lookups are served from the local tier
+        results.append(await search(_criteria()))
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert (local_cache.misses, local_cache.hits) == (1, 3)
+    assert local_cache._inflight == {}
+
+
+def test_concurrent_misses_share_the_failure(local_cache):
+    calls = 0
+
+    async def scenario():
+        release = asyncio.Event()
+
+        @local_cache.cache_decorator(prefix="search_trips")
+        async def search(criteria):
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            raise ValueError("search failed")
+
+        tasks = [asyncio.create_task(search(_criteria())) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        assert local_cache._inflight == {}
+
+        # Failures are not cached: the next lookup runs the search again
+        with pytest.raises(ValueError):
+            await search(_criteria())
+        return outcomes
+
+    outcomes = asyncio.run(scenario())
+
+    assert calls == 2
+    assert [type(outcome) for outcome in outcomes] == [ValueError] * 3
+    assert local_cache._inflight == {}
+    assert local_cache.local_cache == {}
+
+
+def test_invalidate_pattern_matches_search_keys(local_cache):
+    calls = 0
+
+    async def scenario():
+        @local_cache.cache_decorator(prefix="search_trips")
+        async def search(criteria):
+            nonlocal calls
+            calls += 1
+            return []
+
+        await search(_criteria(1000))
+        await search(_criteria(2000))
+        local_cache._local_set("other:key", [], ttl=60)
+
+        assert await local_cache.invalidate_pattern("search_trips:*") == 0
+        assert list(local_cache.local_cache) == ["other:key"]
+
+        await search(_criteria(1000))
+
+    asyncio.run(scenario())
+
+    assert calls == 3
+
+
+def test_cancelled_first_request_does_not_cancel_waiters(local_cache):
+    calls = 0
+
+    async def scenario():
+        release = asyncio.Event()
+
+        @local_cache.cache_decorator(prefix="search_trips")
+        async def search(criteria):
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return []
+
+        owner = asyncio.create_task(search(_criteria()))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(search(_criteria()))
+        await asyncio.sleep(0)
+
+        owner.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        result = await waiter
+        # The shared search still finished and filled the local tier
+        assert local_cache._local_get("search_trips:origin=JFK:nights=3:budget=1000") is result
+        return result
+
+    assert asyncio.run(scenario()) == []
+    assert calls == 1
+    assert local_cache._inflight == {}
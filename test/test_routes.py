@@ -0,0 +1,32 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def test_search_answers_matching_if_none_match_with_304():
+    params = dict(origin="JFK", nights=3, budget=1500)
+    with TestClient(app) as client:
+        first = client.get("/search", params=params)
+        assert first.status_code == 200
+        etag = first.headers["ETag"]
+
+        repeat = client.get("/search", params=params, headers={"If-None-Match": etag})
+        assert repeat.status_code == 304
+        assert repeat.headers["ETag"] == etag
+        assert repeat.content == b""
+
+        stale = client.get("/search", params=params, headers={"If-None-Match": '"stale"'})
+        assert stale.status_code == 200
+        assert stale.headers["ETag"] == etag
+        assert stale.json() == first.json()
+
+        other = client.get("/search", params=dict(params, budget=5000), headers={"If-None-Match": etag})
+        assert other.status_code == 200
+        assert other.headers["ETag"] != etag
+
+
+def test_search_accepts_an_unlimited_budget():
+    with TestClient(app) as client:
+        response = client.get("/search", params=dict(origin="JFK", nights=3, budget="inf"))
+    assert response.status_code == 200
+    assert response.json()
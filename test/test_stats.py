@@ -0,0 +1,95 @@
+import asyncio
+
+from app.main import app, lifespan
+from app.services.stats import SearchStats, SearchStatsQueue
+
+
+def _record(origin: str = "JFK", destination: str = "LAX", success: bool = True):
+    return dict(origin=origin, destinations=[destination], budget=1000.0, success=success, duration_ms=12.5)
+
+
+class _BatchRecorder(SearchStats):
+    def __init__(self):
+        super().__init__()
+        self.batch_sizes = []
+
+    def log_search_batch(self, records):
+        self.batch_sizes.append(len(records))
+        super().log_search_batch(records)
+
+
+def test_queued_records_are_applied_in_batches():
+    stats = _BatchRecorder()
+
+    async def scenario():
+        queue = SearchStatsQueue(stats, batch_size=3)
+        for _ in range(7):
+            queue.record(**_record())
+        queue.start()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert stats.batch_sizes == [3, 3, 1]
+        await queue.stop()
+
+    asyncio.run(scenario())
+
+    assert stats.total_searches == 7
+    assert stats.route_totals["JFK-LAX"]["searches"] == 7
+
+
+def test_full_queue_drops_and_counts_records():
+    stats = SearchStats()
+
+    async def scenario():
+        queue = SearchStatsQueue(stats, maxsize=2)
+        for _ in range(5):
+            queue.record(**_record())
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(scenario())
+
+    assert queue.dropped == 3
+    assert stats.total_searches == 2
+
+
+def test_bad_record_does_not_stop_the_drain():
+    stats = _BatchRecorder()
+
+    async def scenario():
+        queue = SearchStatsQueue(stats, batch_size=4)
+        queue.record(**_record())
+        queue.record(origin="JFK")  # Missing fields; logged and skipped
+        queue.record(**_record(success=False))
+        queue.record(**_record(destination="LHR"))
+        queue.start()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        # The good records around the bad one in the same batch are still applied
+        assert stats.batch_sizes == [4]
+        assert stats.total_searches == 3
+        queue.record(**_record())
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert stats.total_searches == 4
+        await queue.stop()
+
+    asyncio.run(scenario())
+
+    assert stats.failed_searches == 1
+    assert stats.popular_destinations == {"LAX": 3, "LHR": 1}
+
+
+def test_lifespan_shutdown_drains_pending_records():
+    async def scenario():
+        async with lifespan(app):
+            # Queued without yielding, so only the shutdown flush can apply them
+            for destination in ("LAX", "LHR", "LAX"):
+                app.state.stats_queue.record(**_record(destination=destination))
+            assert app.state.stats.total_searches == 0
+        return app.state.stats
+
+    stats = asyncio.run(scenario())
+
+    assert stats.total_searches == 3
+    assert stats.popular_destinations == {"LAX": 2, "LHR": 1}
@@ -0,0 +1,41 @@
+import pytest
+
+from app.services.travel_api import _parse_hhmm, parse_hotels
+
+
+def test_parse_hhmm():
+    assert _parse_hhmm("00:00") == 0
+    assert _parse_hhmm("07:05") == 425
+    assert _parse_hhmm("23:59") == 23 * 60 + 59
+
+
+@pytest.mark.parametrize("value", ["07:5x", "9:30", "24:30", "12:60", "1230", "12-30", "12:3", "", "１２:３０"])
+def test_parse_hhmm_rejects_malformed_times(value):
+    with pytest.raises(ValueError):
+        _parse_hhmm(value)
+
+
+def _hotel_row(id, **fields):
+    row = dict(id=id, name="Hotel", city_code="LAX", stars=4, rating=4.5, price_per_night=120.0, amenities=["WIFI", "POOL"])
+    row.update(fields)
+    return row
+
+
+def test_parse_hotels_skips_rows_the_hotel_fields_reject():
+    rows = [
+        _hotel_row("ok"),
+        _hotel_row("float-stars", stars=4.7),
+        _hotel_row("string-stars", stars="3"),
+        _hotel_row("fractional-string-stars", stars="4.5"),
+        _hotel_row("no-stars", stars=None),
+        _hotel_row("huge-stars", stars="9" * 400),
+        _hotel_row("null-amenity", amenities=["Bar", None]),
+        _hotel_row("amenities-not-a-list", amenities="WIFI"),
+        _hotel_row("free", price_per_night=0),
+        _hotel_row("no-city", city_code=""),
+    ]
+
+    hotels, hotels_by_city = parse_hotels(rows)
+
+    assert [(h.id, h.stars) for h in hotels] == [("ok", 4), ("float-stars", 4), ("string-stars", 3)]
+    assert hotels_by_city == {"LAX": hotels}
@@ -0,0 +1,26 @@
+import pytest
+
+from app.config.config import FLIGHT_QUALITY_WEIGHTS as W
+from app.models.domain import Flight
+from app.services.scoring.trip_scorer import TripScorer
+
+
+def _flight(id, departure_time, stops=(), airline=None, aircraft_type=None):
+    return Flight(id, "JFK", "LAX", departure_time, departure_time + 300, 100.0, stops, airline, aircraft_type)
+
+
+def test_score_flight_paths_averages_known_carrier_details():
+    morning = _flight("f1", 9 * 60, stops=("ORD",), airline="Emirates")
+    midday = _flight("f2", 13 * 60, airline="Unlisted", aircraft_type="A320")
+    plain = _flight("f3", 2 * 60)
+
+    scores = TripScorer().score_flight_paths([[morning, midday], [], [plain]])
+
+    # Unlisted airlines count as 0; flights with no airline/aircraft are left out of the average
+    two_legs = (90 * W["TIME"] + 60 * W["STOPS"] + 50 * W["AIRLINE"] + 70 * W["AIRCRAFT"]) * 0.9
+    one_leg = 20 * W["TIME"] + 100 * W["STOPS"]
+    assert scores.tolist() == pytest.approx([two_legs, 0, one_leg])
+
+
+def test_score_flight_paths_of_no_paths():
+    assert TripScorer().score_flight_paths([]).tolist() == []
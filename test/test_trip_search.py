@@ -0,0 +1,109 @@
+import numpy as np
+import orjson
+import pytest
+
+from app.config.config import FLIGHTS_FILE, HOTELS_FILE
+from app.services.search.criteria import SearchCriteria
+from app.services.search.trip_search import TripSearch
+from app.services.travel_api import TravelAPI
+
+
+@pytest.fixture(scope="module")
+def trip_search() -> TripSearch:
+    api = TravelAPI(orjson.loads(FLIGHTS_FILE.read_bytes()), orjson.loads(HOTELS_FILE.read_bytes()))
+    return api.search_engine.search_engine
+
+
+def _summary(packages):
+    return [
+        (p.destination, p.hotel.id, [f.id for f in p.outbound_path], [f.id for f in p.return_path], p.score)
+        for p in packages
+    ]
+
+
+def test_top_k_keeps_earliest_ties_across_the_cut():
+    scores = np.array([1.0] * 10 + [2.0])
+    assert TripSearch._top_k(scores, 3).tolist() == [10, 0, 1]
+
+    scores = np.array([3.0, 2.0, 5.0, 2.0, 5.0, 2.0, 1.0, 2.0])
+    assert TripSearch._top_k(scores, 4).tolist() == [2, 4, 0, 1]
+    assert TripSearch._top_k(scores, 6).tolist() == [2, 4, 0, 1, 3, 5]
+
+
+def test_top_k_matches_stable_sort():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        scores = rng.choice([1.0, 1.5, 2.0, 2.5], size=rng.integers(0, 40))
+        k = int(rng.integers(0, 45))
+        expected = np.argsort(-scores, kind="stable")[:k]
+        assert TripSearch._top_k(scores, k).tolist() == expected.tolist()
+
+
+def test_top_k_of_nothing():
+    assert TripSearch._top_k(np.array([2.0, 1.0]), 0).tolist() == []
+    assert TripSearch._top_k(np.empty(0), 5).tolist() == []
+
+
+def test_search_results_are_a_prefix_of_the_full_ranking(trip_search):
+    criteria = dict(origin="JFK", nights=3, budget=5000)
+    top = trip_search._search(SearchCriteria(**criteria))
+    everything = trip_search._search(SearchCriteria(**criteria, result_limit=10**6))
+    assert len(everything) > len(top) == 50
+    assert _summary(top) == _summary(everything[:50])
+
+
+def test_search_ranking_on_bundled_data(trip_search):
+    # Four packages score 2.89 around the 50-result cut; the first two generated are kept
+    results = trip_search._search(SearchCriteria(origin="JFK", nights=3, budget=5000))
+    direct_lax = [
+        ("hotel28", "flight101", "flight105", 5.62), ("hotel33", "flight101", "flight105", 5.58),
+        ("hotel28", "flight101", "flight106", 5.57), ("hotel27", "flight101", "flight105", 5.56),
+        ("hotel33", "flight101", "flight106", 5.54), ("hotel27", "flight101", "flight106", 5.52),
+        ("hotel28", "flight101", "flight104", 5.38), ("hotel33", "flight101", "flight104", 5.34),
+        ("hotel27", "flight101", "flight104", 5.32), ("hotel28", "flight102", "flight105", 4.9),
+        ("hotel33", "flight102", "flight105", 4.87), ("hotel28", "flight102", "flight106", 4.85),
+        ("hotel27", "flight102", "flight105", 4.84), ("hotel33", "flight102", "flight106", 4.82),
+        ("hotel27", "flight102", "flight106", 4.8), ("hotel28", "flight102", "flight104", 4.66),
+        ("hotel33", "flight102", "flight104", 4.62), ("hotel28", "flight103", "flight105", 4.61),
+        ("hotel27", "flight102", "flight104", 4.6), ("hotel33", "flight103", "flight105", 4.58),
+        ("hotel27", "flight103", "flight105", 4.56), ("hotel28", "flight103", "flight106", 4.56),
+        ("hotel33", "flight103", "flight106", 4.53), ("hotel27", "flight103", "flight106", 4.51),
+        ("hotel28", "flight103", "flight104", 4.37), ("hotel33", "flight103", "flight104", 4.34),
+        ("hotel27", "flight103", "flight104", 4.32),
+    ]
+    via_lhr = ["flight110", "flight113", "flight116"]
+    expected = [("LAX", hotel, [out], [ret], score) for hotel, out, ret, score in direct_lax] + [
+        ("LHR", "hotel29", ["flight108"], via_lhr + ["flight104"], 2.98),
+        ("LHR", "hotel34", ["flight108"], via_lhr + ["flight104"], 2.97),
+        ("LHR", "hotel29", ["flight107"], via_lhr + ["flight104"], 2.95),
+        ("LHR", "hotel29", ["flight108"], via_lhr + ["flight105"], 2.95),
+        ("LHR", "hotel29", ["flight109"], via_lhr + ["flight104"], 2.94),
+        ("LHR", "hotel34", ["flight107"], via_lhr + ["flight104"], 2.94),
+        ("LHR", "hotel29", ["flight108"], ["flight111", "flight113", "flight116", "flight104"], 2.93),
+        ("LHR", "hotel34", ["flight108"], via_lhr + ["flight105"], 2.93),
+        ("LHR", "hotel34", ["flight109"], via_lhr + ["flight104"], 2.93),
+        ("LAX", "hotel33", ["flight107"] + via_lhr, ["flight105"], 2.92),
+        ("LHR", "hotel29", ["flight107"], via_lhr + ["flight105"], 2.92),
+        ("LHR", "hotel29", ["flight108"], ["flight110", "flight113", "flight117", "flight104"], 2.92),
+        ("LHR", "hotel34", ["flight108"], ["flight111", "flight113", "flight116", "flight104"], 2.92),
+        ("LAX", "hotel27", ["flight107"] + via_lhr, ["flight105"], 2.91),
+        ("LHR", "hotel29", ["flight109"], via_lhr + ["flight105"], 2.91),
+        ("LAX", "hotel28", ["flight107"] + via_lhr, ["flight105"], 2.9),
+        ("LAX", "hotel33", ["flight107"] + via_lhr, ["flight106"], 2.9),
+        ("LHR", "hotel29", ["flight107"], ["flight111", "flight113", "flight116", "flight104"], 2.9),
+        ("LHR", "hotel29", ["flight108"], ["flight111", "flight113", "flight116", "flight105"], 2.9),
+        ("LHR", "hotel34", ["flight107"], via_lhr + ["flight105"], 2.9),
+        ("LHR", "hotel34", ["flight108"], ["flight110", "flight113", "flight117", "flight104"], 2.9),
+        ("LAX", "hotel27", ["flight107"] + via_lhr, ["flight106"], 2.89),
+        ("LHR", "hotel29", ["flight109"], ["flight111", "flight113", "flight116", "flight104"], 2.89),
+    ]
+    assert _summary(results) == expected
+
+
+def test_unlimited_budget_finds_every_package(trip_search):
+    unlimited = trip_search._search(SearchCriteria(origin="JFK", nights=3, budget=float("inf"), result_limit=10**6))
+    ample = trip_search._search(SearchCriteria(origin="JFK", nights=3, budget=10**9, result_limit=10**6))
+    assert unlimited
+    assert [(p.destination, p.hotel.id, p.total_cost) for p in unlimited] == [
+        (p.destination, p.hotel.id, p.total_cost) for p in ample
+    ]